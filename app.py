@@ -1,10 +1,15 @@
 import webbrowser
+from multiprocessing import current_process
 from threading import Timer
 
 from flask import Flask, render_template_string
 
+from core.jobs import job_manager
 from core.state import search_terms, get_state_value
 from routes.gallery import gallery_bp
+from routes.jobs import jobs_bp
+from routes.metrics import metrics_bp
+from utils.profiling import profiling_enabled
 from routes.review import review_bp
 from routes.settings import settings_bp
 from routes.setup import setup_bp
@@ -16,12 +21,13 @@ from utils.common_utils import (create_folders_if_not_exist,
 
 create_folders_if_not_exist([
     "assets",
-    "assets/zip_files",
     f"assets/{project_name}",
     f"assets/{project_name}/image_files",
     f"assets/{project_name}/json_files",
     f"assets/{project_name}/video_files",
-    f"assets/{project_name}/log_files"
+    f"assets/{project_name}/log_files",
+    f"assets/{project_name}/tmp_files",
+    f"assets/{project_name}/job_files"
 ])
 
 create_files_if_not_exist([
@@ -29,8 +35,10 @@ create_files_if_not_exist([
     f"assets/{project_name}/json_files/{json_map_file_name}.json"
 ])
 
-delete_files_if_exist("assets/zip_files")
-delete_files_if_exist(f"assets/{project_name}/log_files")
+if current_process().name == 'MainProcess':
+    delete_files_if_exist(f"assets/{project_name}/log_files")
+    delete_files_if_exist(f"assets/{project_name}/tmp_files")
+    job_manager.start()
 
 api_list = ['pexels', 'pixabay', 'unsplash', 'flickr']
 
@@ -50,6 +58,12 @@ app.register_blueprint(review_bp)
 app.register_blueprint(gallery_bp)
 app.register_blueprint(settings_bp)
 app.register_blueprint(setup_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(metrics_bp)
+
+if profiling_enabled:
+    from routes.profiling import profiling_bp
+    app.register_blueprint(profiling_bp)
 
 
 @app.route('/')
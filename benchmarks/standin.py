@@ -0,0 +1,280 @@
+import argparse
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PIXABAY_EXAMPLE = os.path.join(ROOT, 'examples', 'pixabay_api_response.json')
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 0.0
+    bandwidth_kbps: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    chunked_rate: float = 0.0
+    image_kb: int = 200
+    oversize_rate: float = 0.0
+    oversize_kb: int = 2000
+    total_results: int = 300
+    seed: int = 0
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: StandInConfig):
+        super().__init__(address, StandInHandler)
+        self.config = config
+        self.counts: dict[str, int] = {}
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        with open(PIXABAY_EXAMPLE, 'r', encoding='utf-8') as file:
+            self.pixabay_template = json.load(file)['hits'][0]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def count(self, key: str, sent: int):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.bytes_sent += sent
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'requests': dict(self.counts), 'bytes_sent': self.bytes_sent, 'config': asdict(self.config)}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _rng(self) -> random.Random:
+        return random.Random(f"{self.server.config.seed}:{self.path}:{time.monotonic_ns()}")
+
+    def _send(self, body: bytes, content_type: str, status: int = 200, route: str = 'other',
+              headers: Optional[dict] = None):
+        config = self.server.config
+        rng = self._rng()
+        if status == 200 and rng.random() < config.rate_limit_rate:
+            status, body, content_type = 429, b'{"error": "rate limited"}', 'application/json'
+            headers = {'Retry-After': '1'}
+        elif status == 200 and rng.random() < config.error_rate:
+            status, body, content_type = 503, b'{"error": "unavailable"}', 'application/json'
+            headers = {}
+        chunked = rng.random() < config.chunked_rate
+
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        sent = 0
+        if self.command != 'HEAD':
+            chunk_size = 64 * 1024
+            for start in range(0, len(body), chunk_size):
+                chunk = body[start:start + chunk_size]
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n" if chunked else chunk)
+                sent += len(chunk)
+                if config.bandwidth_kbps:
+                    time.sleep(len(chunk) / (config.bandwidth_kbps * 1000))
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        self.server.count(f"{self.command} {route}", sent)
+
+    def _send_json(self, data: dict, route: str):
+        self._send(json.dumps(data).encode(), 'application/json', route=route)
+
+    def _image_url(self, provider: str, image_id, variant: str, kb: Optional[int] = None) -> str:
+        config = self.server.config
+        if kb is None:
+            rng = random.Random(f"{config.seed}:{provider}:{image_id}")
+            kb = config.oversize_kb if rng.random() < config.oversize_rate else config.image_kb
+        return f"{self.server.base_url}/cdn/{provider}/{image_id}_{variant}.jpg?kb={kb}"
+
+    def _page(self, query: dict, per_page_key: str = 'per_page') -> tuple[int, int, int]:
+        page = int(query.get('page', ['1'])[0])
+        per_page = int(query.get(per_page_key, ['15'])[0])
+        total = self.server.config.total_results
+        count = max(0, min(per_page, total - (page - 1) * per_page))
+        return page, per_page, count
+
+    def _term_id(self, term: str, page: int, idx: int, per_page: int) -> int:
+        prefix = int(hashlib.sha1(term.encode()).hexdigest()[:6], 16)
+        return prefix * 100_000 + (page - 1) * per_page + idx
+
+    def _pixabay(self, query: dict):
+        page, per_page, count = self._page(query)
+        term = query.get('q', [''])[0]
+        hits = []
+        for idx in range(count):
+            image_id = self._term_id(term, page, idx, per_page)
+            hit = copy.deepcopy(self.server.pixabay_template)
+            hit.update({'id': image_id,
+                        'previewURL': self._image_url('pixabay', image_id, '150', 8),
+                        'webformatURL': self._image_url('pixabay', image_id, '640', 60),
+                        'largeImageURL': self._image_url('pixabay', image_id, '1280'),
+                        'fullHDURL': self._image_url('pixabay', image_id, '1920'),
+                        'imageURL': self._image_url('pixabay', image_id, 'original')})
+            hits.append(hit)
+        total = self.server.config.total_results
+        self._send_json({'total': total, 'totalHits': total, 'hits': hits}, 'pixabay_search')
+
+    def _unsplash(self, query: dict):
+        page, per_page, count = self._page(query)
+        term = query.get('query', [''])[0]
+        results = []
+        for idx in range(count):
+            image_id = f"u{self._term_id(term, page, idx, per_page)}"
+            urls = {variant: f"{self._image_url('unsplash', image_id, variant)}&ixid=standin&fm=jpg"
+                    for variant in ('raw', 'full', 'regular', 'small', 'thumb')}
+            results.append({'id': image_id, 'created_at': '2024-01-01T00:00:00Z', 'width': 4000, 'height': 3000,
+                            'color': '#cccccc', 'blur_hash': None, 'description': term,
+                            'alt_description': term, 'urls': urls,
+                            'links': {'self': '', 'html': '', 'download': ''},
+                            'user': {'id': 'standin', 'username': 'standin', 'name': 'Stand In',
+                                     'profile_image': {'small': '', 'medium': '', 'large': ''},
+                                     'links': {'self': '', 'html': '', 'photos': ''}},
+                            'current_user_collections': []})
+        total = self.server.config.total_results
+        self._send_json({'total': total, 'total_pages': -(-total // max(per_page, 1)), 'results': results},
+                        'unsplash_search')
+
+    def _pexels(self, query: dict):
+        page, per_page, count = self._page(query)
+        term = query.get('query', [''])[0]
+        photos = []
+        for idx in range(count):
+            image_id = self._term_id(term, page, idx, per_page)
+            src = {variant: self._image_url('pexels', image_id, variant, kb)
+                   for variant, kb in (('original', None), ('large2x', None), ('large', 120), ('medium', 60),
+                                       ('small', 20), ('portrait', 60), ('landscape', 60), ('tiny', 8))}
+            photos.append({'id': image_id, 'width': 4000, 'height': 3000,
+                           'url': f"https://www.pexels.com/photo/{image_id}/", 'photographer': 'Stand In',
+                           'photographer_url': '', 'photographer_id': 1, 'avg_color': '#cccccc',
+                           'src': src, 'liked': False, 'alt': term})
+        total = self.server.config.total_results
+        next_page = f"{self.server.base_url}/pexels/v1/search?query={term}&page={page + 1}&per_page={per_page}" \
+            if page * per_page < total else None
+        self._send_json({'page': page, 'per_page': per_page, 'photos': photos, 'total_results': total,
+                         'next_page': next_page}, 'pexels_search')
+
+    def _flickr(self, query: dict):
+        term = query.get('text', [''])[0]
+        host = self.server.base_url
+        images = ''.join(f'<img src="{host}/cdn/live.staticflickr.com/{self._term_id(term, 1, idx, 100)}_ab_m.jpg">'
+                         for idx in range(100))
+        self._send(f"<html><body>{images}</body></html>".encode(), 'text/html', route='flickr_search')
+
+    def _image(self, path: str, query: dict):
+        kb = int(query.get('kb', [str(self.server.config.image_kb)])[0])
+        header = path.encode()
+        body = (header * (kb * 1000 // max(len(header), 1) + 1))[:kb * 1000]
+        self._send(b'\xff\xd8' + body[2:], 'image/jpeg', route='cdn')
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.startswith('/pixabay'):
+            return self._pixabay(query)
+        if url.path.startswith('/unsplash/search/photos'):
+            return self._unsplash(query)
+        if url.path.startswith('/pexels/v1/search'):
+            return self._pexels(query)
+        if url.path.startswith('/flickr'):
+            return self._flickr(query)
+        if url.path.startswith('/cdn/'):
+            return self._image(url.path, query)
+        if url.path == '/_stats':
+            body = json.dumps(self.server.stats()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._send(b'{"error": "not found"}', 'application/json', status=404)
+
+
+def provider_env(base_url: str) -> dict[str, str]:
+    return {
+        'PIXABAY_API_URL': f"{base_url}/pixabay/",
+        'PIXABAY_API_KEY': 'standin',
+        'UNSPLASH_API_URL': f"{base_url}/unsplash",
+        'UNSPLASH_API_KEY': 'standin',
+        'PEXELS_API_URL': f"{base_url}/pexels/v1",
+        'PEXELS_API_KEY': 'standin',
+        'FLICKR_SCRAPPER_URL': f"{base_url}/flickr/search/",
+    }
+
+
+def start_standin(config: StandInConfig, host: str = '127.0.0.1', port: int = 0) -> StandInServer:
+    server = StandInServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name='standin', daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay before every response')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0.0, help='per-connection bandwidth, 0 = unlimited')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='share of 429 responses')
+    parser.add_argument('--chunked-rate', type=float, default=0.0,
+                        help='share of responses sent chunked, without Content-Length')
+    parser.add_argument('--image-kb', type=int, default=200, help='size of full-size image variants')
+    parser.add_argument('--oversize-rate', type=float, default=0.0, help='share of images above the size limit')
+    parser.add_argument('--oversize-kb', type=int, default=2000, help='size of oversized images')
+    parser.add_argument('--total-results', type=int, default=300, help='results available per search term')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> StandInConfig:
+    return StandInConfig(latency_ms=args.latency_ms, bandwidth_kbps=args.bandwidth_kbps,
+                         error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                         chunked_rate=args.chunked_rate, image_kb=args.image_kb,
+                         oversize_rate=args.oversize_rate, oversize_kb=args.oversize_kb,
+                         total_results=args.total_results, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline stand-in for the provider APIs and image CDNs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandInServer((args.host, args.port), config_from_args(args))
+    print(f"Stand-in providers listening on {server.base_url}, point the app at them with:")
+    for name, value in provider_env(server.base_url).items():
+        print(f"{name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
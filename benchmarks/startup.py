@@ -0,0 +1,43 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROVIDER_MODULES = ['utils.pexel_utils', 'utils.pixabay_utils', 'utils.unsplash_utils', 'utils.flickr_utils',
+                    'bs4']
+
+
+def time_import(module: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'import {module}'], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def loaded_provider_modules(module: str) -> list[str]:
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {PROVIDER_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.strip().splitlines()
+    return [name for name in (output[-1] if output else '').split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start time of the app')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--module', default='app')
+    args = parser.parse_args()
+
+    baseline = [time_import('flask') for _ in range(args.runs)]
+    timings = [time_import(args.module) for _ in range(args.runs)]
+    print(f"import {args.module}: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms over {args.runs} runs "
+          f"(bare interpreter + flask: {statistics.median(baseline) * 1000:.0f} ms)")
+    print(f"provider modules loaded at startup: {', '.join(loaded_provider_modules(args.module)) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
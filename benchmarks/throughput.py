@@ -0,0 +1,246 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.standin import add_config_arguments, provider_env  # noqa: E402
+
+DEFAULT_APIS = ['pexels', 'pixabay', 'unsplash', 'flickr']
+WORKLOADS = ['search', 'review', 'download']
+
+
+@dataclass
+class WorkloadResult:
+    name: str
+    operations: int = 0
+    seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list, repr=False)
+    items: int = 0
+    bytes: int = 0
+    errors: int = 0
+    requests: dict[str, int] = field(default_factory=dict)
+    peak_rss_mb: float = 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> dict:
+        data = asdict(self)
+        data.pop('latencies')
+        data.update({'ops_per_second': self.operations / self.seconds if self.seconds else 0.0,
+                     'items_per_second': self.items / self.seconds if self.seconds else 0.0,
+                     'mb_per_second': self.bytes / 1_000_000 / self.seconds if self.seconds else 0.0,
+                     'p50_ms': self.percentile(50) * 1000, 'p99_ms': self.percentile(99) * 1000,
+                     'mean_ms': statistics.fmean(self.latencies) * 1000 if self.latencies else 0.0})
+        return data
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    base_url = f"http://127.0.0.1:{args.port}"
+    command = [sys.executable, '-m', 'benchmarks.standin', '--port', str(args.port),
+               '--latency-ms', str(args.latency_ms), '--bandwidth-kbps', str(args.bandwidth_kbps),
+               '--error-rate', str(args.error_rate), '--rate-limit-rate', str(args.rate_limit_rate),
+               '--chunked-rate', str(args.chunked_rate), '--image-kb', str(args.image_kb),
+               '--oversize-rate', str(args.oversize_rate), '--oversize-kb', str(args.oversize_kb),
+               '--total-results', str(args.total_results), '--seed', str(args.seed)]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            server_stats(base_url)
+            return process, base_url
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"Stand-in server did not start on {base_url}")
+
+
+def server_stats(base_url: str) -> dict:
+    with urllib.request.urlopen(f"{base_url}/_stats", timeout=2) as response:
+        return json.load(response)
+
+
+def request_delta(before: dict, after: dict) -> dict[str, int]:
+    return {key: count - before['requests'].get(key, 0) for key, count in after['requests'].items()
+            if count - before['requests'].get(key, 0)}
+
+
+def configure_environment(base_url: str, project: str, apis: list[str]):
+    os.environ.update(provider_env(base_url))
+    os.environ.update({'PROJECT_NAME': project, 'SEARCH_CACHE_ENABLED': 'false', 'DOWNLOAD_IMAGES': 'false',
+                       'MIN_IMAGES_PER_TERM': '1000000', 'SEARCH_RATE_LIMIT_MAX_WAIT': '30'})
+    for api in apis:
+        os.environ[f'{api.upper()}_RATE_LIMIT'] = '1000000/1'
+        os.environ[f'{api.upper()}_DOWNLOAD_RATE_LIMIT'] = '1000000/1'
+
+
+def run_search(apis: list[str], terms: list[str], workers: int, limit: int) -> tuple[WorkloadResult, dict]:
+    from core.providers import get_provider
+
+    result = WorkloadResult('search')
+    found: dict[str, dict[str, list[dict]]] = {api: {} for api in apis}
+
+    def search(api: str, term: str):
+        provider = get_provider(api)
+        start = time.perf_counter()
+        photos = provider.search(term, limit=limit)
+        return api, term, time.perf_counter() - start, [provider.to_json(photo) for photo in photos]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for api, term, seconds, images in executor.map(lambda job: search(*job),
+                                                       [(api, term) for term in terms for api in apis]):
+            result.operations += 1
+            result.latencies.append(seconds)
+            result.items += len(images)
+            result.errors += 0 if images else 1
+            found[api][term] = images
+    result.seconds = time.perf_counter() - start
+    return result, found
+
+
+def run_review(api: str, actions: int) -> WorkloadResult:
+    from app import app
+
+    client = app.test_client()
+    client.post('/api-decision', data={'action': f'use-{api}-api'})
+    result = WorkloadResult('review')
+    start = time.perf_counter()
+    for idx in range(actions):
+        for method, path, data in (('GET', '/review', None),
+                                   ('POST', '/decision', {'action': 'yes' if idx % 2 == 0 else 'no'})):
+            request_start = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            result.latencies.append(time.perf_counter() - request_start)
+            result.operations += 1
+            result.errors += 0 if response.status_code < 400 else 1
+        result.items += 1 if idx % 2 == 0 else 0
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_download(found: dict[str, dict[str, list[dict]]], project: str) -> WorkloadResult:
+    from core.providers import get_provider
+    from utils.common_utils import term_to_folder_name
+    from utils.download_utils import download_images, DownloadResult
+
+    tasks = []
+    for api, images in found.items():
+        data = {term_to_folder_name(term): term_images for term, term_images in images.items()}
+        tasks.extend(get_provider(api).download_tasks(data, f"assets/{project}/image_files/{api}"))
+
+    result = WorkloadResult('download')
+
+    def on_result(download: DownloadResult):
+        result.latencies.append(download.seconds)
+        result.errors += 1 if download.status == 'failed' else 0
+
+    stats = download_images(tasks, on_result=on_result)
+    result.operations = len(tasks)
+    result.items = stats.downloaded + stats.deduplicated
+    result.bytes = stats.total_bytes
+    result.seconds = stats.elapsed
+    return result
+
+
+def print_result(result: WorkloadResult):
+    summary = result.summary()
+    requests_made = ', '.join(f"{key}: {count}" for key, count in sorted(result.requests.items())) or 'none'
+    print(f"{result.name:<9} {summary['operations']:>6} ops in {summary['seconds']:7.2f}s | "
+          f"{summary['ops_per_second']:8.1f} ops/s {summary['items_per_second']:8.1f} images/s "
+          f"{summary['mb_per_second']:6.2f} MB/s | p50 {summary['p50_ms']:7.1f} ms p99 {summary['p99_ms']:7.1f} ms | "
+          f"errors {summary['errors']} | peak RSS {summary['peak_rss_mb']:.0f} MB")
+    print(f"{'':<9} HTTP requests: {requests_made}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Search, review and download throughput against the '
+                                                 'offline provider stand-in')
+    parser.add_argument('--api', action='append', dest='apis', help=f'provider to benchmark (default: '
+                                                                    f'{", ".join(DEFAULT_APIS)})')
+    parser.add_argument('--workload', action='append', dest='workloads', choices=WORKLOADS)
+    parser.add_argument('--terms', type=int, default=20, help='search terms per provider')
+    parser.add_argument('--limit', type=int, default=30, help='results per search')
+    parser.add_argument('--search-workers', type=int, default=4)
+    parser.add_argument('--review-actions', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark project folder')
+    parser.add_argument('--verbose', action='store_true', help='show application logs')
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    apis = args.apis or DEFAULT_APIS
+    workloads = args.workloads or WORKLOADS
+    project = f"benchmark_{os.getpid()}"
+    terms = [f"benchmark term {idx}" for idx in range(args.terms)]
+
+    process, base_url = start_server(args)
+    os.chdir(ROOT)
+    configure_environment(base_url, project, apis)
+    if not args.keep:
+        atexit.register(shutil.rmtree, f"assets/{project}", ignore_errors=True)
+    for folder in ('json_files', 'log_files', 'tmp_files', 'image_files'):
+        os.makedirs(f"assets/{project}/{folder}", exist_ok=True)
+    with open(f"assets/{project}/search.txt", 'w', encoding='utf-8') as file:
+        file.write('\n'.join(terms) + '\n')
+
+    from utils.log_utils import logger
+    if not args.verbose:
+        logger.setLevel(logging.ERROR)
+
+    results = []
+    try:
+        found = {}
+        for workload in WORKLOADS:
+            if workload not in workloads and not (workload == 'search' and 'download' in workloads):
+                continue
+            before = server_stats(base_url)
+            if workload == 'search':
+                result, found = run_search(apis, terms, args.search_workers, args.limit)
+            elif workload == 'review':
+                result = run_review(apis[0], args.review_actions)
+            else:
+                result = run_download(found, project)
+            result.requests = request_delta(before, server_stats(base_url))
+            result.peak_rss_mb = peak_rss_mb()
+            if workload in workloads:
+                results.append(result)
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"providers: {', '.join(apis)}, {args.terms} terms, stand-in latency {args.latency_ms:.0f} ms")
+    for result in results:
+        print_result(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'apis': apis, 'terms': args.terms, 'results': [result.summary() for result in results]},
+                      file, indent=2)
+    return 1 if any(result.errors for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
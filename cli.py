@@ -0,0 +1,58 @@
+import argparse
+import sys
+
+from core.providers import API_TYPES, default_provider
+from utils.common_utils import create_folders_if_not_exist, create_files_if_not_exist, project_name, \
+    json_map_file_name, min_image_for_term, read_search_terms
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m cli', description='Media Reviewer batch tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    collect_parser = commands.add_parser('collect', help='auto-accept the top results for every search term')
+    collect_parser.add_argument('--api', action='append', choices=API_TYPES, dest='apis',
+                                help='provider to query, repeat for several (default: first available)')
+    collect_parser.add_argument('--top-k', type=int, default=None,
+                                help='maximum results accepted per provider and term')
+    collect_parser.add_argument('--min-images', type=int, default=min_image_for_term,
+                                help='stop accepting once a term has this many images')
+    collect_parser.add_argument('--workers', type=int, default=None, help='terms processed in parallel')
+    collect_parser.add_argument('--download', action='store_true', help='download the accepted images')
+    collect_parser.add_argument('--terms-file', help='read terms from this file instead of search.txt')
+    return parser.parse_args(argv)
+
+
+def run_collect(args: argparse.Namespace) -> int:
+    from core.collector import collect, collect_top_k, collect_workers
+
+    terms = read_search_terms(args.terms_file, []) if args.terms_file else None
+    results = collect(api_types=args.apis or [default_provider()],
+                      top_k=args.top_k or collect_top_k,
+                      min_images=args.min_images,
+                      workers=args.workers or collect_workers,
+                      download=args.download,
+                      terms=terms)
+    return 1 if any(result.error for result in results) else 0
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    create_folders_if_not_exist([
+        f"assets/{project_name}/image_files",
+        f"assets/{project_name}/json_files",
+        f"assets/{project_name}/log_files",
+        f"assets/{project_name}/tmp_files"
+    ])
+    create_files_if_not_exist([
+        f"assets/{project_name}/search.txt",
+        f"assets/{project_name}/json_files/{json_map_file_name}.json"
+    ])
+
+    if args.command == 'collect':
+        return run_collect(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
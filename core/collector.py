@@ -0,0 +1,110 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from core.jobs import get_download_tasks
+from core.providers import get_provider
+from core.state import image_store, search_file_path, save_state_json
+from utils.common_utils import project_name, term_to_folder_name, read_search_terms, min_image_for_term
+from utils.download_utils import DownloadStats, download_images
+from utils.log_utils import logger
+from utils.rate_limit_utils import wait_for_search_tokens
+
+load_dotenv()
+
+collect_workers = int(os.getenv('COLLECT_WORKERS', '8'))
+collect_top_k = int(os.getenv('COLLECT_TOP_K', '5'))
+
+
+@dataclass
+class TermResult:
+    term: str
+    added: dict[str, int] = field(default_factory=dict)
+    existing: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def total_added(self) -> int:
+        return sum(self.added.values())
+
+
+def search_images(api_type: str, term: str, limit: int) -> list[dict]:
+    provider = get_provider(api_type)
+    with wait_for_search_tokens():
+        photos = provider.search(term, limit=limit)
+    return [provider.to_json(photo) for photo in photos[:limit]]
+
+
+def collect_term(term: str, api_types: list[str], top_k: int, min_images: int) -> TermResult:
+    start = time.perf_counter()
+    key = term_to_folder_name(term)
+    result = TermResult(term=term, existing=image_store.count(key))
+    needed = min_images - result.existing
+    if needed <= 0:
+        return result
+
+    with ThreadPoolExecutor(max_workers=len(api_types)) as executor:
+        searches = {api_type: executor.submit(search_images, api_type, term, top_k) for api_type in api_types}
+
+    for api_type in api_types:
+        try:
+            images = searches[api_type].result()
+        except Exception as e:
+            logger.error(f"Error searching {api_type} for '{term}': {e}")
+            result.error = str(e)
+            continue
+        for image in images:
+            if needed <= 0:
+                break
+            if image_store.add(key, image):
+                result.added[api_type] = result.added.get(api_type, 0) + 1
+                needed -= 1
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def download_collected(results: list[TermResult], api_types: list[str]) -> DownloadStats:
+    added_keys = {term_to_folder_name(result.term) for result in results if result.total_added}
+    data = {key: image_store.term_images(key) for key in added_keys}
+    tasks = [task for api_type in api_types
+             for task in get_download_tasks(api_type, f"assets/{project_name}/image_files/{api_type}", data)]
+    return download_images(tasks)
+
+
+def collect(api_types: list[str], top_k: int = collect_top_k, min_images: int = min_image_for_term,
+            workers: int = collect_workers, download: bool = False,
+            terms: Optional[list[str]] = None) -> list[TermResult]:
+    terms = terms if terms is not None else read_search_terms(search_file_path, [])
+    start = time.perf_counter()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(collect_term, term, api_types, top_k, min_images): term for term in terms}
+        for idx, future in enumerate(as_completed(futures), 1):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error collecting '{futures[future]}': {e}")
+                result = TermResult(term=futures[future], error=str(e))
+            results.append(result)
+            if result.total_added or result.error:
+                per_api = ", ".join(f"{api}: {count}" for api, count in result.added.items()) or "none"
+                logger.info(f"[{idx}/{len(terms)}] '{result.term}' +{result.total_added} ({per_api}) "
+                            f"in {result.seconds:.2f}s")
+
+    save_state_json()
+    elapsed = time.perf_counter() - start
+    added = sum(result.total_added for result in results)
+    satisfied = sum(1 for result in results if result.existing + result.total_added >= min_images)
+    logger.info(f"Collected {added} images for {len(terms)} terms in {elapsed:.2f}s "
+                f"({satisfied}/{len(terms)} terms have at least {min_images} images)")
+
+    if download and added:
+        download_collected(results, api_types)
+    return results
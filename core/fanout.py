@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, Future
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from utils.log_utils import logger
+
+fanout_deadline_seconds = float(os.getenv('FANOUT_DEADLINE_SECONDS', '8'))
+fanout_concurrent_terms = 3
+
+
+@dataclass
+class TaggedPhoto:
+    api_type: str
+    photo: Any
+
+    @property
+    def id(self):
+        return self.photo.id
+
+
+def interleave(results: dict[str, list[Any]], api_types: list[str]) -> list[TaggedPhoto]:
+    merged = []
+    lists = [(api_type, results.get(api_type) or []) for api_type in api_types]
+    for idx in range(max((len(photos) for _, photos in lists), default=0)):
+        merged.extend(TaggedPhoto(api_type, photos[idx]) for api_type, photos in lists if idx < len(photos))
+    return merged
+
+
+class FanOutSearch:
+    def __init__(self, search: Callable[[str, str, int], list[Any]], api_types: list[str],
+                 deadline: float = fanout_deadline_seconds):
+        self._search = search
+        self.api_types = api_types
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=len(api_types) * fanout_concurrent_terms,
+                                            thread_name_prefix='fanout')
+
+    def _safe_search(self, api_type: str, term: str, page: int) -> list[Any]:
+        try:
+            return self._search(api_type, term, page) or []
+        except Exception as e:
+            logger.error(f"Error searching {api_type} for '{term}': {e}")
+            return []
+
+    def search(self, term: str, api_types: Optional[list[str]] = None, page: int = 1,
+               on_late: Optional[Callable[[list[TaggedPhoto]], None]] = None) -> list[TaggedPhoto]:
+        api_types = api_types if api_types is not None else self.api_types
+        futures: dict[Future, str] = {self._executor.submit(self._safe_search, api_type, term, page): api_type
+                                      for api_type in api_types}
+        done, pending = wait(futures, timeout=self.deadline)
+        merged = interleave({futures[future]: future.result() for future in done}, api_types)
+
+        if pending:
+            logger.warning(f"{', '.join(futures[f] for f in pending)} did not answer '{term}' within "
+                           f"{self.deadline:.0f}s, appending their results when they arrive")
+            lock = threading.Lock()
+
+            def append_late(future: Future):
+                late = [TaggedPhoto(futures[future], photo) for photo in future.result()]
+                if on_late is not None:
+                    on_late(late)
+                    return
+                with lock:
+                    merged.extend(late)
+
+            for future in pending:
+                future.add_done_callback(append_late)
+        return merged
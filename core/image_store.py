@@ -0,0 +1,308 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from utils.common_utils import read_json_file, save_json_file
+from utils.log_utils import logger
+from utils.metrics import persist_seconds
+
+journal_compact_every = int(os.getenv('JOURNAL_COMPACT_EVERY', '500'))
+
+
+ImageKey = tuple[str, str]
+
+
+def image_key(api_type: str, image_id) -> ImageKey:
+    return api_type, str(image_id)
+
+
+@dataclass
+class _Index:
+    images: dict[str, dict[ImageKey, dict]] = field(default_factory=dict)
+    locations: dict[ImageKey, set[str]] = field(default_factory=dict)
+    term_counts: dict[str, dict[str, int]] = field(default_factory=dict)
+    total: int = 0
+
+    def insert(self, term: str, image: dict) -> Optional[dict]:
+        key = image_key(image.get('apiType'), image.get('id'))
+        term_images = self.images.setdefault(term, {})
+        if key in term_images:
+            return None
+        term_images[key] = image
+        self.locations.setdefault(key, set()).add(term)
+        self.count(term, image.get('apiType'), 1)
+        return image
+
+    def delete(self, term: str, key: ImageKey) -> Optional[dict]:
+        image = self.images.get(term, {}).pop(key, None)
+        if image is None:
+            return None
+        terms = self.locations.get(key)
+        if terms is not None:
+            terms.discard(term)
+            if not terms:
+                del self.locations[key]
+        self.count(term, key[0], -1)
+        return image
+
+    def apply(self, record: dict) -> Optional[dict]:
+        if record['op'] == 'add':
+            return self.insert(record['term'], record['image'])
+        elif record['op'] == 'remove':
+            return self.delete(record['term'], image_key(record['apiType'], record['id']))
+        elif record['op'] == 'batch':
+            applied = [self.apply(item) for item in record['records']]
+            return {'applied': sum(1 for item in applied if item is not None)}
+        return None
+
+    def apply_counts(self, record: dict):
+        if record['op'] == 'add':
+            self.count(record['term'], record['image'].get('apiType'), 1)
+        elif record['op'] == 'remove':
+            self.count(record['term'], record['apiType'], -1)
+        elif record['op'] == 'batch':
+            for item in record['records']:
+                self.apply_counts(item)
+
+    def count(self, term: str, api_type: Optional[str], delta: int):
+        counts = self.term_counts.setdefault(term, {})
+        counts[api_type] = counts.get(api_type, 0) + delta
+        self.total += delta
+
+
+class ImageStore:
+    def __init__(self, json_path: str, compact_every: int = journal_compact_every):
+        self.json_path = json_path
+        self.journal_path = f"{os.path.splitext(json_path)[0]}.journal"
+        self.summary_path = f"{os.path.splitext(json_path)[0]}.summary.json"
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._journal_size = 0
+        self._journal_damaged = False
+        self._index = _Index()
+        self._loaded = False
+        self._counted = False
+        self._load_summary()
+
+    @property
+    def images(self) -> dict[str, dict[ImageKey, dict]]:
+        self._ensure_loaded()
+        return self._index.images
+
+    def term_images(self, term: str) -> list[dict]:
+        with self._lock:
+            return list(self.images.get(term, {}).values())
+
+    def to_json(self) -> dict[str, list[dict]]:
+        with self._lock:
+            return {term: list(images.values()) for term, images in self.images.items()}
+
+    @property
+    def term_counts(self) -> dict[str, dict[str, int]]:
+        if not self._counted:
+            self._ensure_loaded()
+        return self._index.term_counts
+
+    @property
+    def total(self) -> int:
+        if not self._counted:
+            self._ensure_loaded()
+        return self._index.total
+
+    def _map_signature(self) -> Optional[list[int]]:
+        if not os.path.exists(self.json_path):
+            return None
+        stat = os.stat(self.json_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _read_journal(self) -> Iterator[dict]:
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring truncated journal entry in {self.journal_path}")
+                    self._journal_damaged = True
+                    return
+
+    def _load_summary(self):
+        if not os.path.exists(self.summary_path):
+            return
+        try:
+            summary = read_json_file(self.summary_path)
+        except (OSError, ValueError):
+            return
+        if summary.get('map') != self._map_signature():
+            return
+        index = _Index(term_counts=summary['term_counts'], total=summary['total'])
+        for record in self._read_journal():
+            index.apply_counts(record)
+        self._index = index
+        self._counted = True
+
+    def _save_summary(self):
+        save_json_file(self.summary_path, {'map': self._map_signature(), 'total': self._index.total,
+                                           'term_counts': self._index.term_counts})
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._index = self._load()
+            self._loaded = True
+            self._counted = True
+            if self._journal_damaged:
+                self.compact()
+
+    def _load(self) -> _Index:
+        index = _Index()
+        if os.path.exists(self.json_path) and os.path.getsize(self.json_path) > 0:
+            for term, term_images in read_json_file(self.json_path).items():
+                index.images[term] = {}
+                for image in term_images:
+                    index.insert(term, image)
+
+        journal_size = 0
+        for record in self._read_journal():
+            index.apply(record)
+            journal_size += 1
+        self._journal_size = journal_size
+        return index
+
+    def count(self, term: str, api_type: Optional[str] = None) -> int:
+        counts = self.term_counts.get(term, {})
+        return counts.get(api_type, 0) if api_type else sum(counts.values())
+
+    def satisfied_terms(self, min_images: int) -> set[str]:
+        return {term for term, counts in self.term_counts.items() if sum(counts.values()) >= min_images}
+
+    def find_image(self, api_type: str, image_id) -> Optional[tuple[str, dict]]:
+        key = image_key(api_type, image_id)
+        with self._lock:
+            self._ensure_loaded()
+            terms = self._index.locations.get(key)
+            if not terms:
+                return None
+            term = next(iter(terms))
+            return term, self._index.images[term][key]
+
+    def _append(self, record: dict):
+        start = time.perf_counter()
+        with open(self.journal_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        self._journal_size += 1
+        persist_seconds.observe(time.perf_counter() - start, 'journal')
+        if self._journal_size >= self.compact_every:
+            self.compact()
+
+    def add(self, term: str, image: dict) -> bool:
+        record = {'op': 'add', 'term': term, 'image': image}
+        with self._lock:
+            self._ensure_loaded()
+            if self._index.apply(record) is None:
+                return False
+            self._append(record)
+            return True
+
+    def remove(self, term: str, image_id, api_type: str) -> Optional[dict]:
+        record = {'op': 'remove', 'term': term, 'id': image_id, 'apiType': api_type}
+        with self._lock:
+            self._ensure_loaded()
+            image = self._index.apply(record)
+            if image is not None:
+                self._append(record)
+            return image
+
+    def remove_many(self, items: list[tuple[str, str, str]]) -> list[tuple[str, dict]]:
+        removed = []
+        records = []
+        with self._lock:
+            self._ensure_loaded()
+            for term, api_type, image_id in items:
+                image = self._index.delete(term, image_key(api_type, image_id))
+                if image is not None:
+                    removed.append((term, image))
+                    records.append({'op': 'remove', 'term': term, 'id': image.get('id'), 'apiType': api_type})
+            if records:
+                self._append({'op': 'batch', 'records': records})
+        return removed
+
+    def move_many(self, items: list[tuple[str, str, str]], target_term: str) -> list[tuple[str, dict]]:
+        moved = []
+        records = []
+        with self._lock:
+            self._ensure_loaded()
+            for term, api_type, image_id in items:
+                key = image_key(api_type, image_id)
+                if term == target_term or key not in self._index.images.get(term, {}):
+                    continue
+                image = self._index.delete(term, key)
+                records.append({'op': 'remove', 'term': term, 'id': image.get('id'), 'apiType': api_type})
+                if self._index.insert(target_term, image) is not None:
+                    records.append({'op': 'add', 'term': target_term, 'image': image})
+                moved.append((term, image))
+            if records:
+                self._append({'op': 'batch', 'records': records})
+        return moved
+
+    def compact(self):
+        with self._lock:
+            if not self._loaded:
+                return
+            start = time.perf_counter()
+            save_json_file(self.json_path, self.to_json())
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._journal_size = 0
+            self._save_summary()
+            persist_seconds.observe(time.perf_counter() - start, 'compact')
+
+    def _matches(self, term: str, image: dict, api_type: Optional[str], query: Optional[str]) -> bool:
+        if api_type and image.get('apiType') != api_type:
+            return False
+        return not query or query in term.lower() or query in str(image.get('id')).lower()
+
+    def page_terms(self, api_type: Optional[str] = None, query: Optional[str] = None,
+                   offset: int = 0, limit: int = 20) -> tuple[list[tuple[str, int]], int]:
+        query = query.lower() if query else None
+        with self._lock:
+            if query:
+                matching = [(term, sum(1 for image in images.values()
+                                       if self._matches(term, image, api_type, query)))
+                            for term, images in self.images.items()]
+            else:
+                matching = [(term, self.count(term, api_type)) for term in self.term_counts]
+        matching = [(term, count) for term, count in matching if count > 0]
+        return matching[offset:offset + limit], len(matching)
+
+    def page_images(self, term: Optional[str] = None, api_type: Optional[str] = None,
+                    query: Optional[str] = None, offset: int = 0,
+                    limit: int = 40) -> tuple[list[tuple[str, dict]], int]:
+        query = query.lower() if query else None
+        page = []
+        total = 0
+        with self._lock:
+            terms = [term] if term is not None else list(self.images)
+            for current in terms:
+                images = self.images.get(current, {}).values()
+                if not query:
+                    count = self.count(current, api_type)
+                    if total + count <= offset or len(page) >= limit:
+                        total += count
+                        continue
+                for image in images:
+                    if not self._matches(current, image, api_type, query):
+                        continue
+                    if total >= offset and len(page) < limit:
+                        page.append((current, image))
+                    total += 1
+        return page, total
@@ -0,0 +1,264 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from core.providers import get_provider
+from core.state import image_store
+from utils.common_utils import project_name, create_folders_if_not_exist, save_json_file, read_json_file
+from utils.download_utils import DownloadTask, DownloadResult, download_images
+from utils.log_utils import logger
+
+load_dotenv()
+
+job_folder = f"assets/{project_name}/job_files"
+job_save_interval = float(os.getenv('JOB_SAVE_INTERVAL_SECONDS', '2'))
+
+ACTIVE_STATUSES = {'queued', 'running'}
+FINAL_STATUSES = {'completed', 'cancelled', 'failed'}
+CHECKPOINT_STATUSES = {'downloaded', 'deduplicated', 'skipped'}
+
+
+@dataclass
+class Job:
+    id: str
+    api_type: str
+    folder: str
+    status: str = 'queued'
+    total: int = 0
+    done: int = 0
+    deduplicated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    run_started_at: Optional[float] = field(default=None, repr=False)
+    run_processed: int = field(default=0, repr=False)
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.deduplicated + self.skipped + self.failed
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.status != 'running' or not self.run_started_at or not self.run_processed:
+            return None
+        rate = self.run_processed / (time.time() - self.run_started_at)
+        return max(0, self.total - self.processed) / rate if rate else None
+
+    def to_json(self) -> dict:
+        data = asdict(self)
+        data.pop('run_started_at')
+        data.pop('run_processed')
+        data['processed'] = self.processed
+        data['eta_seconds'] = self.eta_seconds
+        return data
+
+
+def _task_key(task: DownloadTask) -> str:
+    return f"{task.folder}:{task.api_type}:{task.image_id}"
+
+
+class JobManager:
+    def __init__(self, build_tasks: Callable[[str, str], list[DownloadTask]], folder: str = job_folder):
+        self._build_tasks = build_tasks
+        self.folder = folder
+        self._jobs: dict[str, Job] = {}
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._changed = threading.Condition()
+        self._lock = threading.RLock()
+        self._version = 0
+        self._worker: Optional[threading.Thread] = None
+
+    def _meta_path(self, job_id: str) -> str:
+        return os.path.join(self.folder, f"{job_id}.json")
+
+    def _progress_path(self, job_id: str) -> str:
+        return os.path.join(self.folder, f"{job_id}.progress")
+
+    def _save(self, job: Job):
+        with self._lock:
+            save_json_file(self._meta_path(job.id), job.to_json())
+
+    def _notify(self):
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def _load_progress(self, job_id: str) -> dict[str, tuple[str, int]]:
+        results = {}
+        path = self._progress_path(job_id)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    results[record['key']] = (record['status'], record['bytes'])
+        return results
+
+    def start(self):
+        if self._worker is not None:
+            return
+        create_folders_if_not_exist([self.folder])
+        for entry in sorted(os.scandir(self.folder), key=lambda e: e.stat().st_mtime):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                data = read_json_file(entry.path)
+                job = Job(**{k: v for k, v in data.items() if k not in ('processed', 'eta_seconds')})
+            except (ValueError, TypeError) as e:
+                logger.error(f"Ignoring unreadable job file {entry.path}: {e}")
+                continue
+            self._jobs[job.id] = job
+            if job.status in ACTIVE_STATUSES:
+                job.status = 'queued'
+                self._queue.put(job.id)
+                logger.info(f"Resuming download job {job.id} ({job.api_type})")
+
+        self._worker = threading.Thread(target=self._run, name='download-jobs', daemon=True)
+        self._worker.start()
+
+    def submit(self, api_type: str, folder: str) -> Job:
+        self.start()
+        job = Job(id=uuid.uuid4().hex[:12], api_type=api_type, folder=folder)
+        self._jobs[job.id] = job
+        self._save(job)
+        self._queue.put(job.id)
+        self._notify()
+        logger.info(f"Queued download job {job.id} ({api_type})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _set_status(self, job_id: str, status: str, allowed: set[str]) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in allowed:
+                return None
+            job.status = status
+            if status in FINAL_STATUSES:
+                job.finished_at = time.time()
+            self._save(job)
+        self._notify()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        return self._set_status(job_id, 'cancelled', ACTIVE_STATUSES | {'paused'})
+
+    def pause(self, job_id: str) -> Optional[Job]:
+        return self._set_status(job_id, 'paused', ACTIVE_STATUSES)
+
+    def resume(self, job_id: str) -> Optional[Job]:
+        job = self._set_status(job_id, 'queued', {'paused', 'failed'})
+        if job is not None:
+            self._queue.put(job_id)
+        return job
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        with self._changed:
+            if self._version == version:
+                self._changed.wait(timeout)
+            return self._version
+
+    def _run(self):
+        while True:
+            job = self._jobs.get(self._queue.get())
+            if job is None or job.status != 'queued':
+                continue
+            try:
+                self._run_job(job)
+            except Exception as e:
+                logger.error(f"Download job {job.id} failed: {e}")
+                with self._lock:
+                    job.status = 'failed'
+                    job.error = str(e)
+                    job.finished_at = time.time()
+                    self._save(job)
+                self._notify()
+
+    def _run_job(self, job: Job):
+        tasks = self._build_tasks(job.api_type, job.folder)
+        task_keys = {_task_key(task) for task in tasks}
+        results = {key: value for key, value in self._load_progress(job.id).items() if key in task_keys}
+        pending = [task for task in tasks if results.get(_task_key(task), ('failed',))[0] not in CHECKPOINT_STATUSES]
+
+        with self._lock:
+            if job.status != 'queued':
+                return
+            job.status = 'running'
+            job.total = len(tasks)
+            job.started_at = job.started_at or time.time()
+            job.run_started_at = time.time()
+            job.run_processed = 0
+            self._apply_counts(job, results)
+            self._save(job)
+        self._notify()
+
+        lock = threading.Lock()
+        last_save = [time.monotonic()]
+
+        with open(self._progress_path(job.id), 'a', encoding='utf-8') as progress:
+            def on_result(result: DownloadResult):
+                key = _task_key(result.task)
+                with lock:
+                    progress.write(json.dumps({'key': key, 'status': result.status,
+                                               'bytes': result.size_bytes}) + '\n')
+                    progress.flush()
+                    previous = results.get(key)
+                    if previous is not None:
+                        self._count(job, *previous, -1)
+                    results[key] = (result.status, result.size_bytes)
+                    self._count(job, result.status, result.size_bytes, 1)
+                    job.run_processed += 1
+                    if time.monotonic() - last_save[0] >= job_save_interval:
+                        last_save[0] = time.monotonic()
+                        self._save(job)
+                self._notify()
+
+            download_images(pending, on_result=on_result, should_stop=lambda: job.status != 'running')
+            os.fsync(progress.fileno())
+
+        with self._lock:
+            if job.status == 'running':
+                job.status = 'completed'
+                job.finished_at = time.time()
+                logger.info(f"Download job {job.id} completed: {job.done} downloaded, "
+                            f"{job.deduplicated} deduplicated, {job.skipped} skipped, {job.failed} failed")
+            self._save(job)
+        self._notify()
+
+    @staticmethod
+    def _count(job: Job, status: str, size: int, delta: int):
+        attribute = {'downloaded': 'done'}.get(status, status)
+        setattr(job, attribute, getattr(job, attribute) + delta)
+        job.bytes += size * delta
+
+    def _apply_counts(self, job: Job, results: dict[str, tuple[str, int]]):
+        job.done = job.deduplicated = job.skipped = job.failed = job.bytes = 0
+        for status, size in results.values():
+            self._count(job, status, size, 1)
+
+
+def get_download_tasks(api_type: str, folder: str, data: Optional[dict] = None) -> list[DownloadTask]:
+    if data is None:
+        data = image_store.to_json()
+    create_folders_if_not_exist([folder])
+    return get_provider(api_type).download_tasks(data, folder)
+
+
+job_manager = JobManager(get_download_tasks)
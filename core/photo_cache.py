@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+photo_cache_max_mb = float(os.getenv('PHOTO_CACHE_MAX_MB', '64'))
+photo_cache_pin_radius = int(os.getenv('PHOTO_CACHE_PIN_RADIUS', '2'))
+
+
+def estimate_size(obj: Any) -> int:
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(vars(item))
+        elif type(item).__sizeof__ is object.__sizeof__:
+            stack.extend(getattr(item, name) for cls in type(item).__mro__
+                         for name in getattr(cls, '__slots__', ()) if hasattr(item, name))
+    return size
+
+
+class PhotoCache:
+    def __init__(self, max_bytes: int = int(photo_cache_max_mb * 1024 * 1024),
+                 pin_radius: int = photo_cache_pin_radius):
+        self.max_bytes = max_bytes
+        self.pin_radius = pin_radius
+        self._entries: OrderedDict[int, Any] = OrderedDict()
+        self._sizes: dict[int, int] = {}
+        self._bytes = 0
+        self._center = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, idx: int) -> bool:
+        with self._lock:
+            return idx in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __getitem__(self, idx: int) -> Any:
+        with self._lock:
+            self._entries.move_to_end(idx)
+            return self._entries[idx]
+
+    def __setitem__(self, idx: int, photos: Any):
+        size = estimate_size(photos)
+        with self._lock:
+            if idx in self._entries:
+                self._bytes -= self._sizes[idx]
+            self._entries[idx] = photos
+            self._entries.move_to_end(idx)
+            self._sizes[idx] = size
+            self._bytes += size
+            self._evict()
+
+    def resize(self, idx: int):
+        with self._lock:
+            if idx not in self._entries:
+                return
+            photos = self._entries[idx]
+        size = estimate_size(photos)
+        with self._lock:
+            if self._entries.get(idx) is photos:
+                self._bytes += size - self._sizes[idx]
+                self._sizes[idx] = size
+                self._evict()
+
+    def get(self, idx: int, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            if idx not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self[idx]
+
+    def is_pinned(self, idx: int) -> bool:
+        return abs(idx - self._center) <= self.pin_radius
+
+    def pin(self, center: int):
+        with self._lock:
+            self._center = center
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        for idx in [idx for idx in self._entries if not self.is_pinned(idx)]:
+            self._bytes -= self._sizes.pop(idx)
+            del self._entries[idx]
+            self.evictions += 1
+            if self._bytes <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'pinned_center': self._center,
+                'pin_radius': self.pin_radius,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,130 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Iterator, Optional
+
+from core.photo_cache import estimate_size
+from utils.log_utils import logger
+
+PageFetcher = Callable[[str, str, int, Callable[[list[Any]], None]], tuple[list[Any], Optional[bool]]]
+
+search_page_size = int(os.getenv('SEARCH_PAGE_SIZE', '30'))
+page_lookahead = int(os.getenv('PAGE_LOOKAHEAD', '10'))
+max_search_pages = int(os.getenv('MAX_SEARCH_PAGES', '10'))
+page_workers = int(os.getenv('PAGE_WORKERS', '2'))
+
+
+class PhotoStream:
+    __slots__ = ('api_type', 'term', 'page_size', 'next_page', 'exhausted', '_photos', '_fetch', '_executor',
+                 '_is_done', '_on_page', '_key', '_future', '_lock', '_lookahead', '_max_pages')
+
+    def __init__(self, api_type: str, term: str, first_page: list[Any], fetch: PageFetcher,
+                 executor: ThreadPoolExecutor, key: Callable[[Any], Any], is_done: Callable[[], bool],
+                 on_page: Callable[[], None], page_size: Optional[int], lookahead: int, max_pages: int,
+                 has_more: Optional[bool] = None):
+        self.api_type = api_type
+        self.term = term
+        self.page_size = page_size
+        self.next_page = 2
+        if has_more is None:
+            has_more = bool(first_page) and (page_size is None or len(first_page) >= page_size)
+        self.exhausted = not has_more
+        self._photos = first_page
+        self._fetch = fetch
+        self._executor = executor
+        self._key = key
+        self._is_done = is_done
+        self._on_page = on_page
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._lookahead = lookahead
+        self._max_pages = max_pages
+
+    def __len__(self) -> int:
+        return len(self._photos)
+
+    def __getitem__(self, idx: int) -> Any:
+        return self._photos[idx]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._photos))
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + estimate_size(self._photos)
+
+    def _merge(self, photos: list[Any]) -> list[Any]:
+        seen = {self._key(photo) for photo in self._photos}
+        new_photos = []
+        for photo in photos:
+            key = self._key(photo)
+            if key not in seen:
+                seen.add(key)
+                new_photos.append(photo)
+        self._photos.extend(new_photos)
+        return new_photos
+
+    def _add_late(self, photos: list[Any]):
+        with self._lock:
+            new_photos = self._merge(photos)
+        if new_photos:
+            logger.info(f"Added {len(new_photos)} late photos to '{self.term}' from {self.api_type}")
+            self._on_page()
+
+    def _load_page(self, page: int):
+        try:
+            photos, has_more = self._fetch(self.api_type, self.term, page, self._add_late)
+        except Exception as e:
+            logger.error(f"Error fetching page {page} of '{self.term}' from {self.api_type}: {e}")
+            photos, has_more = [], None
+
+        with self._lock:
+            new_photos = self._merge(photos)
+            self.next_page = page + 1
+            if has_more is None:
+                has_more = bool(new_photos) and (self.page_size is None or len(photos) >= self.page_size)
+            self.exhausted = not has_more or page >= self._max_pages
+            self._future = None
+        logger.info(f"Loaded page {page} of '{self.term}' from {self.api_type}: {len(new_photos)} new photos"
+                    f"{', no more pages' if self.exhausted else ''}")
+        if new_photos:
+            self._on_page()
+
+    def _schedule(self) -> Optional[Future]:
+        with self._lock:
+            if self._future is None and not self.exhausted:
+                self._future = self._executor.submit(self._load_page, self.next_page)
+            return self._future
+
+    def ensure_ahead(self, position: int):
+        if self.exhausted or len(self._photos) - position > self._lookahead or self._is_done():
+            return
+        self._schedule()
+
+    def wait_for(self, position: int) -> bool:
+        while position >= len(self._photos):
+            if self.exhausted or self._is_done():
+                return False
+            future = self._schedule()
+            if future is not None:
+                future.result()
+        return True
+
+
+class PagedSearch:
+    def __init__(self, fetch: PageFetcher, key: Callable[[Any], Any],
+                 page_size: int = search_page_size, lookahead: int = page_lookahead,
+                 max_pages: int = max_search_pages, workers: int = page_workers,
+                 reports_end: Callable[[str], bool] = lambda api_type: False):
+        self._fetch = fetch
+        self._key = key
+        self._reports_end = reports_end
+        self.page_size = page_size
+        self.lookahead = lookahead
+        self.max_pages = max_pages
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='pages')
+
+    def open(self, api_type: str, term: str, first_page: list[Any], is_done: Callable[[], bool],
+             on_page: Callable[[], None], has_more: Optional[bool] = None) -> PhotoStream:
+        return PhotoStream(api_type, term, first_page, self._fetch, self._executor, self._key, is_done, on_page,
+                           page_size=None if api_type == 'all' or self._reports_end(api_type) else self.page_size,
+                           lookahead=self.lookahead, max_pages=self.max_pages, has_more=has_more)
@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from typing import Any, Callable, Optional
+
+from utils.log_utils import logger
+
+prefetch_terms = int(os.getenv('PREFETCH_TERMS', '3'))
+prefetch_workers = int(os.getenv('PREFETCH_WORKERS', '2'))
+
+
+class TermPrefetcher:
+    def __init__(self, fetch: Callable[[str, str], Any], depth: int = prefetch_terms,
+                 workers: int = prefetch_workers):
+        self._fetch = fetch
+        self.depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: dict[tuple[str, int], tuple[int, Future]] = {}
+        self._ready: dict[tuple[str, int], Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _run(self, generation: int, api_type: str, idx: int, term: str) -> Any:
+        try:
+            photos = self._fetch(api_type, term)
+        except Exception as e:
+            logger.error(f"Error prefetching '{term}' from {api_type}: {e}")
+            photos = None
+
+        with self._lock:
+            key = (api_type, idx)
+            if generation == self._generation:
+                if photos is not None:
+                    self._ready[key] = photos
+                if self._pending.get(key, (None,))[0] == generation:
+                    self._pending.pop(key)
+        return photos
+
+    def schedule(self, api_type: str, current_idx: int, terms: list[str], cached: Callable[[int], bool]):
+        if self.depth <= 0:
+            return
+
+        window = range(current_idx + 1, min(current_idx + 1 + self.depth, len(terms)))
+        with self._lock:
+            for key in [key for key in self._ready if key[0] != api_type or key[1] not in window]:
+                self._ready.pop(key)
+
+            for idx in window:
+                key = (api_type, idx)
+                if key in self._ready or key in self._pending or cached(idx):
+                    continue
+                future = self._executor.submit(self._run, self._generation, api_type, idx, terms[idx])
+                self._pending[key] = (self._generation, future)
+
+    def take(self, api_type: str, idx: int) -> Optional[Any]:
+        key = (api_type, idx)
+        with self._lock:
+            photos = self._ready.pop(key, None)
+            pending = self._pending.get(key)
+
+        if photos is None and pending is not None:
+            try:
+                photos = pending[1].result()
+            except CancelledError:
+                photos = None
+            with self._lock:
+                self._ready.pop(key, None)
+
+        with self._lock:
+            if photos is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return photos
+
+    def reset(self):
+        with self._lock:
+            self._generation += 1
+            for _, future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._ready.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'depth': self.depth,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'pending': len(self._pending),
+                'ready': len(self._ready),
+            }
@@ -0,0 +1,155 @@
+import importlib
+import os
+import threading
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+
+from utils.download_utils import DownloadTask, DownloadStats
+from utils.log_utils import logger
+
+load_dotenv()
+
+
+class ProviderUnavailableError(RuntimeError):
+    def __init__(self, name: str, reason: Optional[str]):
+        super().__init__(f"Provider {name} is unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+@dataclass
+class Provider:
+    name: str
+    label: str
+    module_name: str
+    required_env: tuple[str, ...]
+    search_fn: Callable[[ModuleType, str, int, int], list[Any]]
+    to_json_fn: Callable[[ModuleType, Any], dict]
+    download_fn: Callable[[ModuleType, list[Any], str], DownloadStats]
+    tasks_fn: Callable[[ModuleType, dict, str], list[DownloadTask]]
+    url_fn: Callable[[ModuleType, Any], Optional[str]]
+    page_fn: Optional[Callable[[ModuleType, str, int, int], tuple[list[Any], Optional[bool]]]] = None
+    error: Optional[str] = None
+    _module: Optional[ModuleType] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def missing_env(self) -> list[str]:
+        return [name for name in self.required_env if not os.getenv(name)]
+
+    @property
+    def available(self) -> bool:
+        return not self.missing_env and self.error is None
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        if self.missing_env:
+            return f"Missing {', '.join(self.missing_env)}"
+        return self.error
+
+    @property
+    def reports_end(self) -> bool:
+        return self.page_fn is not None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    @property
+    def module(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if not self.available:
+                        raise ProviderUnavailableError(self.name, self.unavailable_reason)
+                    try:
+                        self._module = importlib.import_module(self.module_name)
+                    except (ImportError, EnvironmentError) as e:
+                        self.error = str(e)
+                        logger.error(f"Provider {self.name} is unavailable: {e}")
+                        raise ProviderUnavailableError(self.name, self.error) from e
+        return self._module
+
+    def search(self, term: str, limit: int = 30, page_idx: int = 1) -> list[Any]:
+        return self.search_fn(self.module, term, limit, page_idx) or []
+
+    def search_page(self, term: str, limit: int = 30, page_idx: int = 1) -> tuple[list[Any], Optional[bool]]:
+        if self.page_fn is None:
+            return self.search(term, limit, page_idx), None
+        photos, has_more = self.page_fn(self.module, term, limit, page_idx)
+        return photos or [], has_more
+
+    def to_json(self, photo: Any) -> dict:
+        return self.to_json_fn(self.module, photo)
+
+    def download(self, photos: list[Any], folder: str) -> DownloadStats:
+        return self.download_fn(self.module, photos, folder)
+
+    def download_tasks(self, data: dict, folder: str) -> list[DownloadTask]:
+        return self.tasks_fn(self.module, data, folder)
+
+    def image_url(self, photo: Any) -> Optional[str]:
+        return self.url_fn(self.module, photo)
+
+    def to_info(self) -> dict:
+        return {'name': self.name, 'label': self.label, 'available': self.available,
+                'loaded': self.loaded, 'reason': self.unavailable_reason}
+
+
+def _unsplash_url(module: ModuleType, photo: Any) -> Optional[str]:
+    url = getattr(photo.urls, "full", None) or getattr(photo.urls, "regular", None)
+    return module.remove_id_from_img_url(url) if url else None
+
+
+PROVIDERS: dict[str, Provider] = {provider.name: provider for provider in [
+    Provider(name='pexels', label='Pexels', module_name='utils.pexel_utils', required_env=('PEXELS_API_KEY',),
+             search_fn=lambda m, term, limit, page: m.get_image_from_pexels(term, page_idx=page,
+                                                                            results_per_page=limit),
+             to_json_fn=lambda m, photo: m.convert_pexels_photo_to_json(photo),
+             download_fn=lambda m, photos, folder: m.download_pexels_images(photos, folder),
+             tasks_fn=lambda m, data, folder: m.get_pexels_download_tasks(data, folder),
+             url_fn=lambda m, photo: getattr(photo, "large2x", None) or getattr(photo, "original", None),
+             page_fn=lambda m, term, limit, page: m.get_pexels_photos_page(term, page_idx=page,
+                                                                           results_per_page=limit)),
+    Provider(name='pixabay', label='Pixabay', module_name='utils.pixabay_utils',
+             required_env=('PIXABAY_API_KEY', 'PIXABAY_API_URL'),
+             search_fn=lambda m, term, limit, page: m.get_image_from_pixabay(term, page_idx=page,
+                                                                             results_per_page=limit),
+             to_json_fn=lambda m, photo: m.convert_pixabay_image_to_json(photo),
+             download_fn=lambda m, photos, folder: m.download_pixabay_images(photos, folder),
+             tasks_fn=lambda m, data, folder: m.get_pixabay_download_tasks(data, folder),
+             url_fn=lambda m, photo: photo.largeImageURL),
+    Provider(name='unsplash', label='Unsplash', module_name='utils.unsplash_utils',
+             required_env=('UNSPLASH_API_KEY',),
+             search_fn=lambda m, term, limit, page: m.get_image_from_unsplash(term, limit=limit, page_idx=page),
+             to_json_fn=lambda m, photo: m.convert_unsplash_image_to_json(photo),
+             download_fn=lambda m, photos, folder: m.download_unsplash_images(photos, folder),
+             tasks_fn=lambda m, data, folder: m.get_unsplash_download_tasks(data, folder),
+             url_fn=_unsplash_url),
+    Provider(name='flickr', label='Flickr', module_name='utils.flickr_utils', required_env=(),
+             search_fn=lambda m, term, limit, page: m.get_image_from_flickr(term, limit=limit),
+             to_json_fn=lambda m, photo: m.convert_flickr_image_to_json(photo),
+             download_fn=lambda m, photos, folder: m.download_flickr_images(photos, folder),
+             tasks_fn=lambda m, data, folder: m.get_flickr_download_tasks(data, folder),
+             url_fn=lambda m, photo: getattr(photo, 'hi_res_url', None) or getattr(photo, 'url', None)),
+]}
+
+API_TYPES = list(PROVIDERS)
+
+
+def get_provider(name: str) -> Provider:
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        raise ProviderUnavailableError(name, "unknown provider")
+    return provider
+
+
+def available_providers() -> list[str]:
+    return [name for name, provider in PROVIDERS.items() if provider.available]
+
+
+def default_provider() -> str:
+    return next(iter(available_providers()), API_TYPES[0])
@@ -1,37 +1,44 @@
+import atexit
 import os
 from typing import Any
 
-from utils.common_utils import (project_name, json_map_file_name, read_json_file,
-                                save_json_file, min_image_for_term, read_search_terms)
+from core.image_store import ImageStore
+from core.photo_cache import PhotoCache
+from core.providers import default_provider
+from core.term_store import TermStore
+from utils.common_utils import project_name, json_map_file_name, min_image_for_term
 
 search_file_path = f"assets/{project_name}/search.txt"
 json_file_path = f"assets/{project_name}/json_files/{json_map_file_name}.json"
 
-json_map = read_json_file(json_file_path)
-removed_keys = [key for key in json_map.keys() if len(json_map.get(key)) >= min_image_for_term] if json_map else []
-search_terms = read_search_terms(search_file_path, removed_keys)
-downloaded_images_count = sum(len(v) for v in json_map.values()) if json_map else 0
+image_store = ImageStore(json_file_path)
+search_terms = TermStore(search_file_path,
+                         satisfied_terms=lambda: image_store.satisfied_terms(min_image_for_term),
+                         is_satisfied=lambda key: image_store.count(key) >= min_image_for_term)
 
 state = {
     "term_idx": 0,
     "photo_idx": 0,
-    "photos_cache": {},
-    "downloaded": downloaded_images_count,
-    "downloaded_json": json_map,
-    "current_api": 'pexels'
+    "photos_cache": PhotoCache(),
+    "current_api": default_provider(),
+    "terms_version": search_terms.version
 }
 
 
 def save_state_json():
     folder = f"assets/{project_name}/json_files"
     os.makedirs(folder, exist_ok=True)
-    save_json_file(json_file_path, state["downloaded_json"])
+    image_store.compact()
+
+
+atexit.register(save_state_json)
 
 
 def update_search_terms():
-    global search_terms
-    search_terms = read_search_terms(search_file_path, removed_keys)
+    search_terms.reload(force=True)
 
 
 def get_state_value(key: str) -> Any:
+    if key == "downloaded":
+        return image_store.total
     return state.get(key, None)
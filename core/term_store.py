@@ -0,0 +1,106 @@
+import os
+import threading
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from utils.common_utils import term_to_folder_name, terms_to_folder_names
+from utils.log_utils import logger
+
+read_batch_size = 64 * 1024
+
+
+class TermStore:
+    def __init__(self, file_path: str, satisfied_terms: Callable[[], set[str]],
+                 is_satisfied: Callable[[str], bool]):
+        self.file_path = file_path
+        self._satisfied_terms = satisfied_terms
+        self._is_satisfied = is_satisfied
+        self._lock = threading.Lock()
+        self._all_keys: set[str] = set()
+        self._terms: list[str] = []
+        self._signature: Optional[tuple[int, int]] = None
+        self.version = 0
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __bool__(self) -> bool:
+        return bool(self._terms)
+
+    def __getitem__(self, idx: int) -> str:
+        return self._terms[idx]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._terms)
+
+    def _file_signature(self) -> Optional[tuple[int, int]]:
+        if not os.path.exists(self.file_path):
+            return None
+        stat = os.stat(self.file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _read_terms(self) -> dict[str, str]:
+        terms: dict[str, str] = {}
+        if not os.path.exists(self.file_path):
+            return terms
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            for batch in iter(lambda: list(islice(file, read_batch_size)), []):
+                lines = [line.strip() for line in batch]
+                terms.update(zip(terms_to_folder_names(lines), lines))
+        terms.pop('', None)
+        return terms
+
+    def reload(self, force: bool = False) -> bool:
+        with self._lock:
+            signature = self._file_signature()
+            if not force and signature == self._signature and self._signature is not None:
+                return False
+
+            satisfied = self._satisfied_terms()
+            read_terms = self._read_terms()
+            all_keys = set(read_terms)
+            terms = [term for key, term in read_terms.items() if key not in satisfied]
+
+            added = len(all_keys - self._all_keys)
+            removed = len(self._all_keys - all_keys)
+            self._all_keys = all_keys
+            self._terms = terms
+            self._signature = signature
+            self.version += 1
+        logger.info(f"Loaded {len(all_keys)} search terms ({len(terms)} pending, +{added}/-{removed} since last load)")
+        return True
+
+    def import_terms(self, lines: Iterable[Union[str, bytes]]) -> int:
+        added = 0
+        with self._lock:
+            satisfied = self._satisfied_terms()
+            needs_newline = False
+            if os.path.exists(self.file_path) and os.path.getsize(self.file_path) > 0:
+                with open(self.file_path, 'rb') as file:
+                    file.seek(-1, os.SEEK_END)
+                    needs_newline = file.read(1) != b'\n'
+            with open(self.file_path, 'a', encoding='utf-8') as file:
+                if needs_newline:
+                    file.write('\n')
+                for line in lines:
+                    term = (line.decode('utf-8', errors='replace') if isinstance(line, bytes) else line).strip()
+                    key = term_to_folder_name(term)
+                    if not term or key in self._all_keys:
+                        continue
+                    file.write(term + '\n')
+                    self._all_keys.add(key)
+                    if key not in satisfied:
+                        self._terms.append(term)
+                    added += 1
+            self._signature = self._file_signature()
+        logger.info(f"Imported {added} new search terms")
+        return added
+
+    def is_satisfied(self, idx: int) -> bool:
+        return 0 <= idx < len(self._terms) and self._is_satisfied(term_to_folder_name(self._terms[idx]))
+
+    def next_pending(self, idx: int, step: int = 1) -> int:
+        while 0 <= idx < len(self._terms) and self.is_satisfied(idx):
+            idx += step
+        return idx
@@ -1,27 +1,107 @@
-import json
 import os
-from flask import Blueprint, request, redirect, url_for, render_template_string
-from core.state import json_file_path
-from utils.common_utils import project_name, read_json_file, save_json_file, get_image_url, get_thumbnail, \
-    read_html_as_string, get_project_folder_as_zip
+import sys
+from typing import Optional
+
+from flask import Blueprint, request, redirect, url_for, render_template_string, jsonify, send_file, abort
+from core.state import image_store
+from utils.blob_store import release_images
+from utils.common_utils import project_name, get_image_url, get_thumbnail, read_html_as_string, \
+    get_project_folder_as_zip, term_to_folder_name
 from utils.log_utils import logger
+from utils.thumbnail_utils import get_thumbnail_path, get_or_create_thumbnail, get_thumbnail_source_url, \
+    touch_thumbnail, remove_thumbnail
 
 gallery_bp = Blueprint('gallery', __name__)
 GALLERY_PAGE_HTML = read_html_as_string("templates/gallery_page.html")
+THUMBNAIL_MAX_AGE = 365 * 24 * 3600
 
 
-@gallery_bp.route('/gallery')
-def index():
+def get_int_arg(name: str, default: int, maximum: int) -> int:
     try:
-        gallery_data = read_json_file(json_file_path)
-    except (FileNotFoundError, json.JSONDecodeError):
-        gallery_data = {}
+        value = int(request.args.get(name, default))
+    except ValueError:
+        value = default
+    return max(0, min(value, maximum))
+
+
+def get_api_arg() -> Optional[str]:
+    api_type = request.args.get('api', '').lower()
+    return api_type if api_type and api_type != 'all' else None
+
+
+def serialize_image(term: str, img: dict) -> dict:
+    return {
+        'term': term,
+        'id': img.get('id'),
+        'apiType': img.get('apiType'),
+        'extension': img.get('extension') or 'jpg',
+        'thumb': url_for('gallery.thumbnail', api_type=img.get('apiType'), image_id=img.get('id')),
+        'url': get_image_url(img)
+    }
 
+
+@gallery_bp.route('/gallery')
+def index():
     return render_template_string(GALLERY_PAGE_HTML,
-                                  gallery_data=gallery_data,
-                                  project_name=project_name,
-                                  get_url_func=get_image_url,
-                                  get_thumb_func=get_thumbnail), 200
+                                  total_images=image_store.total,
+                                  project_name=project_name), 200
+
+
+@gallery_bp.route('/api/gallery/terms')
+def api_terms():
+    offset = get_int_arg('offset', 0, sys.maxsize)
+    limit = get_int_arg('limit', 20, 200)
+    terms, total = image_store.page_terms(api_type=get_api_arg(), query=request.args.get('q'),
+                                          offset=offset, limit=limit)
+    return jsonify({
+        'terms': [{'term': term, 'count': count} for term, count in terms],
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
+
+
+@gallery_bp.route('/api/gallery')
+def api_images():
+    offset = get_int_arg('offset', 0, sys.maxsize)
+    limit = get_int_arg('limit', 40, 500)
+    images, total = image_store.page_images(term=request.args.get('term') or None, api_type=get_api_arg(),
+                                            query=request.args.get('q'), offset=offset, limit=limit)
+    return jsonify({
+        'images': [serialize_image(term, img) for term, img in images],
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
+
+
+@gallery_bp.route('/thumb/<api_type>/<image_id>')
+def thumbnail(api_type: str, image_id: str):
+    thumb_path = get_thumbnail_path(api_type, image_id)
+    if os.path.exists(thumb_path):
+        touch_thumbnail(thumb_path)
+    else:
+        found = image_store.find_image(api_type, image_id)
+        if found is None:
+            abort(404)
+        term, img = found
+        local_path = f"assets/{project_name}/image_files/{api_type}/{term}/{image_id}.{img.get('extension') or 'jpg'}"
+        thumb_path = get_or_create_thumbnail(api_type, image_id, local_path=local_path,
+                                             remote_url=get_thumbnail_source_url(img))
+        if thumb_path is None:
+            fallback = get_thumbnail(img)
+            return redirect(fallback) if fallback else abort(404)
+
+    response = send_file(thumb_path, mimetype='image/jpeg', etag=True, conditional=True,
+                         max_age=THUMBNAIL_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
+
+def remove_unused_thumbnails(images: list[tuple[str, str]]):
+    for api_type, image_id in images:
+        if image_store.find_image(api_type, image_id) is None:
+            remove_thumbnail(api_type, str(image_id))
 
 
 @gallery_bp.route('/delete-image', methods=['POST'])
@@ -32,30 +112,61 @@ def delete_image():
     extension = request.form.get('extension', 'jpg')
     full_file_path = f"assets/{project_name}/image_files/{api_type}/{term}/{image_id}.{extension}"
 
-    if os.path.exists(full_file_path):
-        os.remove(full_file_path)
+    release_images([(full_file_path, api_type, image_id)])
 
     try:
-        image_list = read_json_file(json_file_path)
-        images = image_list.get(term, [])
-        image = next((img for img in images
-                      if str(img.get('id')) == str(image_id)
-                      and img.get('apiType') == api_type), None)
-        if image:
-            images.remove(image)
-            image_list[term] = images
-            save_json_file(json_file_path, image_list)
-
+        image_store.remove(term, image_id, api_type)
     except Exception as e:
         logger.error(f"Error deleting image from JSON: {e}")
+    remove_unused_thumbnails([(api_type, image_id)])
 
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'deleted': True})
     return redirect(url_for('gallery.index'))
 
 
+def get_image_file_path(api_type: str, term: str, image: dict) -> str:
+    return f"assets/{project_name}/image_files/{api_type}/{term}/{image.get('id')}.{image.get('extension') or 'jpg'}"
+
+
+@gallery_bp.route('/api/gallery/bulk', methods=['POST'])
+def bulk_images():
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    items = [(str(item.get('term')), str(item.get('apiType')), str(item.get('id')))
+             for item in data.get('images', []) if isinstance(item, dict)]
+    if action not in ('delete', 'move') or not items:
+        return jsonify({'error': "Expected action 'delete' or 'move' and a non-empty images list"}), 400
+
+    if action == 'delete':
+        changed = image_store.remove_many(items)
+        release_images([(get_image_file_path(image.get('apiType'), term, image), image.get('apiType'), image.get('id'))
+                        for term, image in changed])
+        remove_unused_thumbnails([(image.get('apiType'), image.get('id')) for _, image in changed])
+        logger.info(f"Bulk deleted {len(changed)} images")
+        return jsonify({'deleted': len(changed)})
+
+    target = term_to_folder_name(str(data.get('target', '')).strip())
+    if not target or target.startswith('.') or '/' in target or '\\' in target:
+        return jsonify({'error': "Missing or invalid target term"}), 400
+    changed = image_store.move_many(items, target)
+    for term, image in changed:
+        source_path = get_image_file_path(image.get('apiType'), term, image)
+        if os.path.exists(source_path):
+            target_path = get_image_file_path(image.get('apiType'), target, image)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            os.replace(source_path, target_path)
+    logger.info(f"Bulk moved {len(changed)} images to '{target}'")
+    return jsonify({'moved': len(changed), 'target': target})
+
+
 @gallery_bp.route('/download-zip')
 def download_zip():
+    file_types = {ext.strip().lower().lstrip('.') for ext in request.args.get('type', '').split(',') if ext.strip()}
     try:
-        return get_project_folder_as_zip()
+        image_store.compact()
+        return get_project_folder_as_zip(api_type=get_api_arg(), term=request.args.get('term') or None,
+                                         file_types=file_types or None)
     except Exception as e:
         logger.error(f"Error creating zip file: {e}")
         return redirect(url_for("gallery.index"))
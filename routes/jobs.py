@@ -0,0 +1,79 @@
+import json
+import time
+
+from flask import Blueprint, request, jsonify, abort, Response
+
+from core.jobs import job_manager, FINAL_STATUSES
+from core.providers import available_providers
+from utils.common_utils import project_name
+
+jobs_bp = Blueprint('jobs', __name__)
+SSE_KEEPALIVE_SECONDS = 15
+SSE_MIN_INTERVAL_SECONDS = 0.5
+
+
+def get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+@jobs_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({'jobs': [job.to_json() for job in job_manager.jobs()]})
+
+
+@jobs_bp.route('/jobs', methods=['POST'])
+def create_job():
+    api_type = (request.values.get('api') or '').lower()
+    if api_type not in available_providers():
+        return jsonify({'error': f"Provider '{api_type}' is not available"}), 400
+    job = job_manager.submit(api_type, f"assets/{project_name}/image_files/{api_type}")
+    return jsonify(job.to_json()), 202
+
+
+@jobs_bp.route('/jobs/<job_id>')
+def job_status(job_id: str):
+    return jsonify(get_job_or_404(job_id).to_json())
+
+
+@jobs_bp.route('/jobs/<job_id>/events')
+def job_events(job_id: str):
+    job = get_job_or_404(job_id)
+
+    def stream():
+        version = -1
+        last_sent = 0.0
+        while True:
+            current = job_manager.wait_for_change(version, timeout=1.0)
+            if current != version:
+                version = current
+                last_sent = time.monotonic()
+                yield f"event: progress\ndata: {json.dumps(job.to_json())}\n\n"
+                if job.status in FINAL_STATUSES:
+                    return
+                time.sleep(SSE_MIN_INTERVAL_SECONDS)
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@jobs_bp.route('/jobs/<job_id>/<action>', methods=['POST'])
+def job_action(job_id: str, action: str):
+    get_job_or_404(job_id)
+    if action == 'cancel':
+        job = job_manager.cancel(job_id)
+    elif action == 'pause':
+        job = job_manager.pause(job_id)
+    elif action == 'resume':
+        job = job_manager.resume(job_id)
+    else:
+        abort(404)
+
+    if job is None:
+        return jsonify({'error': f"Cannot {action} job in status '{job_manager.get(job_id).status}'"}), 409
+    return jsonify(job.to_json())
@@ -0,0 +1,49 @@
+import time
+
+from flask import Blueprint, Response, request, g
+
+from core.jobs import job_manager
+from core.state import state, image_store
+from routes.review import prefetcher
+from utils.metrics import render_metrics, register_collector, gauge_lines, counter_lines, route_seconds
+
+metrics_bp = Blueprint('metrics', __name__)
+instrumented_blueprints = {'review', 'gallery', 'jobs'}
+
+
+@metrics_bp.before_app_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@metrics_bp.after_app_request
+def record_latency(response: Response) -> Response:
+    start = g.pop('request_start', None)
+    if start is not None and request.blueprint in instrumented_blueprints:
+        route_seconds.observe(time.perf_counter() - start, request.endpoint, request.method, response.status_code)
+    return response
+
+
+def collect_app_metrics() -> list[str]:
+    photo_cache = state["photos_cache"].stats()
+    prefetch = prefetcher.stats()
+    jobs = {}
+    for job in job_manager.jobs():
+        jobs[job.status] = jobs.get(job.status, 0) + 1
+    return (counter_lines('media_photo_cache_lookups_total', 'Photo cache lookups since the cache was created',
+                          [({'result': 'hit'}, photo_cache['hits']), ({'result': 'miss'}, photo_cache['misses'])])
+            + gauge_lines('media_photo_cache_hit_ratio', 'Photo cache hit ratio', [({}, photo_cache['hit_ratio'])])
+            + gauge_lines('media_photo_cache_bytes', 'Estimated photo cache size', [({}, photo_cache['bytes'])])
+            + gauge_lines('media_prefetch_hit_ratio', 'Share of term searches served by the prefetcher',
+                          [({}, prefetch['hit_ratio'])])
+            + gauge_lines('media_images_accepted', 'Images in the image map', [({}, image_store.total)])
+            + gauge_lines('media_jobs', 'Download jobs by status',
+                          [({'status': status}, count) for status, count in jobs.items()]))
+
+
+register_collector(collect_app_metrics)
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,87 @@
+import cProfile
+
+from flask import Blueprint, Response, request, g, jsonify
+
+from core.state import state, image_store
+from utils.log_utils import logger
+from utils.profiling import sampling_profiler, memory_tracker, save_profile
+
+profiling_bp = Blueprint('profiling', __name__)
+
+
+def text_response(body: str, status: int = 200) -> Response:
+    return Response(body, status=status, content_type='text/plain; charset=utf-8')
+
+
+@profiling_bp.before_app_request
+def start_request_profile():
+    mode = request.args.get('profile') or request.headers.get('X-Profile')
+    if mode and request.blueprint != 'profiling':
+        g.profile_mode = mode
+        g.profile = cProfile.Profile()
+        g.profile.enable()
+
+
+@profiling_bp.after_app_request
+def finish_request_profile(response: Response) -> Response:
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    profile.disable()
+    path, stats = save_profile(profile, request.endpoint or 'request')
+    logger.info(f"Saved request profile for {request.method} {request.path} to {path}")
+    response.headers['X-Profile-Path'] = path
+    if g.pop('profile_mode', None) == 'text':
+        return text_response(stats)
+    return response
+
+
+@profiling_bp.route('/admin/profiler', methods=['GET'])
+def profiler_status():
+    return jsonify(sampling_profiler.status())
+
+
+@profiling_bp.route('/admin/profiler/start', methods=['POST'])
+def profiler_start():
+    if not sampling_profiler.start():
+        return jsonify({'error': "Sampling profiler is already running"}), 409
+    logger.info("Sampling profiler started")
+    return jsonify(sampling_profiler.status())
+
+
+@profiling_bp.route('/admin/profiler/stop', methods=['POST'])
+def profiler_stop():
+    stopped = sampling_profiler.stop()
+    if stopped is None:
+        return jsonify({'error': "Sampling profiler is not running"}), 409
+    path, collapsed = stopped
+    logger.info(f"Sampling profiler stopped, collapsed stacks saved to {path}")
+    response = text_response(collapsed)
+    response.headers['X-Profile-Path'] = path
+    return response
+
+
+@profiling_bp.route('/admin/memory/snapshot', methods=['POST'])
+def memory_snapshot():
+    result = memory_tracker.snapshot()
+    result.update({'photo_cache': state["photos_cache"].stats(), 'images_accepted': image_store.total})
+    return jsonify(result)
+
+
+@profiling_bp.route('/admin/memory/diff', methods=['GET'])
+def memory_diff():
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        return jsonify({'error': "group_by must be lineno, filename or traceback"}), 400
+    diff = memory_tracker.diff(limit=request.args.get('limit', 30, type=int), group_by=group_by)
+    if diff is None:
+        return jsonify({'error': "Take a snapshot first"}), 409
+    photo_cache = state["photos_cache"].stats()
+    return text_response(f"photo_cache entries={photo_cache['entries']} bytes={photo_cache['bytes']}\n"
+                         f"images_accepted={image_store.total}\n{diff}")
+
+
+@profiling_bp.route('/admin/memory/stop', methods=['POST'])
+def memory_stop():
+    memory_tracker.stop()
+    return jsonify({'tracing': memory_tracker.tracing})
@@ -1,111 +1,120 @@
 import os
-from typing import Any
-
-from flask import Blueprint, redirect, url_for, render_template_string, request
-from core.state import state, json_file_path, save_state_json, search_terms
+from typing import Any, Callable, Optional
+
+from flask import Blueprint, redirect, url_for, render_template_string, request, jsonify
+from core.jobs import job_manager, ACTIVE_STATUSES
+from core.fanout import FanOutSearch, TaggedPhoto
+from core.photo_stream import PagedSearch, PhotoStream, search_page_size
+from core.prefetch import TermPrefetcher
+from core.providers import PROVIDERS, API_TYPES, get_provider, available_providers, \
+    ProviderUnavailableError
+from core.state import state, search_terms, image_store
 from utils.common_utils import project_name, read_html_as_string, \
-    term_to_folder_name, is_download, create_folders_if_not_exist
-from utils.flickr_utils import get_image_from_flickr, convert_flickr_image_to_json, download_flickr_images, \
-    download_flicker_images_from_json
+    term_to_folder_name, is_download
 from utils.log_utils import logger
-from utils.pexel_utils import get_image_from_pexels, convert_pexels_photo_to_json, download_pexels_images, \
-    download_pexels_images_from_json
-from utils.pixabay_utils import get_image_from_pixabay, convert_pixabay_image_to_json, download_pixabay_images, \
-    download_pixabay_images_from_json
-from utils.unsplash_utils import get_image_from_unsplash, convert_unsplash_image_to_json, remove_id_from_img_url, \
-    download_unsplash_images, download_unsplash_images_from_json
 
 review_bp = Blueprint('review', __name__)
 REVIEW_PAGE_HTML = read_html_as_string("templates/review_page.html")
 
 
+def search_page(api_type: str, term: str, page: int = 1,
+                on_late: Optional[Callable[[list[Any]], None]] = None) -> tuple[list[Any], Optional[bool]]:
+    if api_type == 'all':
+        return fanout.search(term, available_providers(), page=page, on_late=on_late), None
+    try:
+        return get_provider(api_type).search_page(term, limit=search_page_size, page_idx=page)
+    except ProviderUnavailableError as e:
+        logger.error(str(e))
+        return [], None
+
+
+def search_photos(api_type: str, term: str, page: int = 1) -> list[Any]:
+    return search_page(api_type, term, page)[0]
+
+
+prefetcher = TermPrefetcher(search_page)
+fanout = FanOutSearch(search_photos, API_TYPES)
+paged_search = PagedSearch(search_page, lambda photo: (unwrap_photo(photo)[0], str(photo.id)),
+                           reports_end=lambda api_type: api_type in PROVIDERS and PROVIDERS[api_type].reports_end)
+
+
+def unwrap_photo(photo: Any) -> tuple[str, Any]:
+    if isinstance(photo, TaggedPhoto):
+        return photo.api_type, photo.photo
+    return state["current_api"], photo
+
+
 def get_photos_for_term_idx(idx, use_cache=True) -> list[Any]:
     if idx < 0 or idx >= len(search_terms):
         return []
 
-    if use_cache and idx in state["photos_cache"]:
-        return state["photos_cache"][idx]
-    else:
-        state["photos_cache"][idx] = None
-
     api_type = state["current_api"]
-    term = search_terms[idx]
-    photos = []
-
-    if api_type == 'pexels':
-        photos = get_image_from_pexels(term, page_idx=1, results_per_page=30)
-    elif api_type == 'pixabay':
-        photos = get_image_from_pixabay(term, page_idx=1, results_per_page=30)
-    elif api_type == 'unsplash':
-        photos = get_image_from_unsplash(term, limit=30)
-    elif api_type == 'flickr':
-        photos = get_image_from_flickr(term, limit=30)
-
-    state["photos_cache"][idx] = photos
+    state["photos_cache"].pin(idx)
+    photos = state["photos_cache"].get(idx) if use_cache else None
+    if photos is None:
+        first_page = prefetcher.take(api_type, idx)
+        if first_page is None:
+            first_page = search_page(api_type, search_terms[idx])
+        photos, has_more = first_page
+        photos = paged_search.open(api_type, search_terms[idx], photos, has_more=has_more,
+                                   is_done=lambda: search_terms.is_satisfied(idx),
+                                   on_page=lambda: state["photos_cache"].resize(idx))
+        state["photos_cache"][idx] = photos
+
+    prefetcher.schedule(api_type, idx, search_terms, lambda i: i in state["photos_cache"])
     return photos
 
 
-def add_image_to_json(term: str, img: Any):
-    c_api = state["current_api"]
-    json_state = state["downloaded_json"]
-    trm = term_to_folder_name(term)
-    image_list = json_state.get(trm, [])
+def reset_photos_cache():
+    prefetcher.reset()
+    state["photos_cache"].clear()
+
+
+def add_image_to_json(term: str, img: Any) -> bool:
+    c_api, img = unwrap_photo(img)
+    return image_store.add(term_to_folder_name(term), get_provider(c_api).to_json(img))
 
-    if trm not in json_state:
-        json_state[trm] = []
 
-    if f"{img.id}-{c_api}" not in [f"{image['id']}-{c_api}" for image in image_list]:
-        if c_api == 'pexels':
-            json_state[trm].append(convert_pexels_photo_to_json(img))
-        elif c_api == 'pixabay':
-            json_state[trm].append(convert_pixabay_image_to_json(img))
-        elif c_api == 'unsplash':
-            json_state[trm].append(convert_unsplash_image_to_json(img))
-        elif c_api == 'flickr':
-            json_state[trm].append(convert_flickr_image_to_json(img))
+def move_to_next_term():
+    state["term_idx"] = search_terms.next_pending(state["term_idx"] + 1)
+    state["photo_idx"] = 0
 
-        save_state_json()
+
+def has_photo(photos: Any, idx: int) -> bool:
+    if isinstance(photos, PhotoStream):
+        return photos.wait_for(idx)
+    return idx < len(photos)
 
 
 def advance_after_action():
     state["photo_idx"] += 1
     photos = get_photos_for_term_idx(state["term_idx"])
-    if state["photo_idx"] >= len(photos):
-        state["term_idx"] += 1
-        state["photo_idx"] = 0
+    if search_terms.is_satisfied(state["term_idx"]) or not has_photo(photos, state["photo_idx"]):
+        move_to_next_term()
 
 
 def current_photo_info():
     ti = state["term_idx"]
     pi = state["photo_idx"]
-    cur_api = state["current_api"]
-    cur_term = search_terms[ti]
-    cur_term_saved_img_count = len(state["downloaded_json"].get(term_to_folder_name(cur_term), []))
-
     if ti >= len(search_terms):
-        return None, None, None
+        return None, None, None, None
+
+    cur_term = search_terms[ti]
+    cur_term_saved_img_count = image_store.count(term_to_folder_name(cur_term))
 
     photos: Any = get_photos_for_term_idx(ti)
+    if isinstance(photos, PhotoStream):
+        photos.ensure_ahead(pi)
 
     if not photos or pi >= len(photos):
         return cur_term, None, None, None
 
     photo = photos[pi]
-    url = None
-
-    if cur_api == 'pixabay':
-        url = photo.largeImageURL
-        return cur_term, photo, url, cur_term_saved_img_count
-    elif cur_api == 'pexels':
-        url = getattr(photo, "large2x", None) or getattr(photo, "original", None)
-    elif cur_api == 'unsplash':
-        url = getattr(photo.urls, "full", None) or getattr(photo.urls, "regular", None)
-        url = remove_id_from_img_url(url)
-    elif cur_api == 'flickr':
-        url = getattr(photo, 'hi_res_url', None) or getattr(photo, 'url', None)
+    cur_api, raw_photo = unwrap_photo(photo)
+    url = get_provider(cur_api).image_url(raw_photo)
 
     if not url:
-        src = getattr(photo, "src", None)
+        src = getattr(raw_photo, "src", None)
         if isinstance(src, dict):
             url = src.get("large2x") or src.get("original") or next(iter(src.values()), None)
     return cur_term, photo, url, cur_term_saved_img_count
@@ -115,29 +124,21 @@ def download_image(photo: Any, term: str, force_download=False):
     if not is_download and not force_download:
         return
 
-    c_api = state["current_api"]
+    c_api, photo = unwrap_photo(photo)
     folder = f"assets/{project_name}/image_files/{c_api}/{term_to_folder_name(term)}"
     os.makedirs(folder, exist_ok=True)
-
-    if c_api == 'pixabay':
-        download_pixabay_images([photo], folder)
-    elif c_api == 'pexels':
-        download_pexels_images([photo], folder)
-    elif c_api == 'unsplash':
-        download_unsplash_images([photo], folder)
-    elif c_api == 'flickr':
-        download_flickr_images([photo], folder)
+    get_provider(c_api).download([photo], folder)
 
 
 def term_decision_execution(action: str):
     logger.debug(f"Term Decision Execution - Action: {action}")
     if action == "next-term":
-        state["term_idx"] += 1
-        state["photo_idx"] = 0
+        move_to_next_term()
 
     if action == "prev-term":
-        if state["term_idx"] > 0:
-            state["term_idx"] -= 1
+        prev_idx = search_terms.next_pending(state["term_idx"] - 1, step=-1)
+        if prev_idx >= 0:
+            state["term_idx"] = prev_idx
             state["photo_idx"] = 0
 
     return redirect(url_for("review.index"))
@@ -161,7 +162,6 @@ def decision_execution(action: str):
 
     if action == "yes" and photo:
         add_image_to_json(term, photo)
-        state["downloaded"] += 1
         download_image(photo, term)
         advance_after_action()
         return redirect(url_for("review.index"))
@@ -176,39 +176,35 @@ def decision_execution(action: str):
 def api_decision_execution(action: str):
     logger.debug(f"API Decision Execution - Action: {action}")
 
-    if action == "use-pexels-api":
-        state["photos_cache"] = {}
-        state["current_api"] = 'pexels'
+    api_type = action[len("use-"):-len("-api")] if action and action.startswith("use-") and \
+        action.endswith("-api") else None
+    if api_type == 'all' or api_type in available_providers():
+        reset_photos_cache()
+        state["current_api"] = api_type
         state["photo_idx"] = 0
         get_photos_for_term_idx(state["term_idx"], use_cache=False)
 
-    if action == "use-pixabay-api":
-        state["photos_cache"] = {}
-        state["current_api"] = 'pixabay'
-        state["photo_idx"] = 0
-        get_photos_for_term_idx(state["term_idx"], use_cache=False)
+    return redirect(url_for("review.index"))
 
-    if action == "use-unsplash-api":
-        state["photos_cache"] = {}
-        state["current_api"] = 'unsplash'
-        state["photo_idx"] = 0
-        get_photos_for_term_idx(state["term_idx"], use_cache=False)
 
-    if action == "use-flickr-api":
-        state["photos_cache"] = {}
-        state["current_api"] = 'flickr'
-        state["photo_idx"] = 0
-        get_photos_for_term_idx(state["term_idx"], use_cache=False)
-
-    return redirect(url_for("review.index"))
+def get_active_job(api_type: str):
+    return next((job for job in job_manager.jobs()
+                 if api_type in (job.api_type, 'all') and job.status in ACTIVE_STATUSES | {'paused'}), None)
 
 
 @review_bp.route('/review')
 def index():
+    search_terms.reload()
+    if state.get("terms_version") != search_terms.version:
+        state["terms_version"] = search_terms.version
+        state["term_idx"] = min(state["term_idx"], len(search_terms))
+        reset_photos_cache()
     if not search_terms:
         return redirect(url_for("setup.index"))
+    if search_terms.is_satisfied(state["term_idx"]):
+        move_to_next_term()
     if state["term_idx"] >= len(search_terms):
-        return render_template_string(REVIEW_PAGE_HTML, finished=True, downloaded=state["downloaded"])
+        return render_template_string(REVIEW_PAGE_HTML, finished=True, downloaded=image_store.total)
     term, photo, url, cur_term_saved_img_count = current_photo_info()
     finished = False
     if term is None:
@@ -220,9 +216,12 @@ def index():
         term_idx=state["term_idx"],
         total_terms=len(search_terms),
         photo_url=url,
-        downloaded=state["downloaded"],
+        downloaded=image_store.total,
         current_api=state["current_api"],
-        term_photo_counter=cur_term_saved_img_count
+        photo_api=unwrap_photo(photo)[0] if photo is not None else None,
+        providers=[provider.to_info() for provider in PROVIDERS.values()],
+        term_photo_counter=cur_term_saved_img_count,
+        active_job=get_active_job(state["current_api"])
     )
 
 
@@ -235,6 +234,16 @@ def index_by_idx(idx):
     return redirect(url_for("review.index"))
 
 
+@review_bp.route("/review/prefetch-stats")
+def prefetch_stats():
+    return jsonify(prefetcher.stats())
+
+
+@review_bp.route("/review/cache-stats")
+def cache_stats():
+    return jsonify(state["photos_cache"].stats())
+
+
 @review_bp.route("/api-decision", methods=["POST"])
 def api_decision():
     action = request.form.get("action")
@@ -255,17 +264,7 @@ def decision():
 
 @review_bp.route("/download-api-images", methods=["POST"])
 def download_api_images():
-    if state["current_api"] == 'pexels':
-        create_folders_if_not_exist([f"assets/{project_name}/image_files/pexels"])
-        download_pexels_images_from_json(json_file_path, f"assets/{project_name}/image_files/pexels")
-    elif state["current_api"] == 'pixabay':
-        create_folders_if_not_exist([f"assets/{project_name}/image_files/pixabay"])
-        download_pixabay_images_from_json(json_file_path, f"assets/{project_name}/image_files/pixabay")
-    elif state["current_api"] == 'unsplash':
-        create_folders_if_not_exist([f"assets/{project_name}/image_files/unsplash"])
-        download_unsplash_images_from_json(json_file_path, f"assets/{project_name}/image_files/unsplash")
-    elif state["current_api"] == 'flickr':
-        create_folders_if_not_exist([f"assets/{project_name}/image_files/flickr"])
-        download_flicker_images_from_json(json_file_path, f"assets/{project_name}/image_files/flickr")
-
+    api_types = available_providers() if state["current_api"] == 'all' else [state["current_api"]]
+    for api_type in api_types:
+        job_manager.submit(api_type, f"assets/{project_name}/image_files/{api_type}")
     return redirect(url_for("review.index"))
@@ -5,19 +5,22 @@ from utils.common_utils import read_html_as_string, save_text_file, project_name
 
 setup_bp = Blueprint('setup', __name__)
 TXT_SETUP_PAGE_HTML = read_html_as_string("templates/txt_setup_page.html")
-txt_terms = read_search_terms(search_file_path, [])
 
 
 @setup_bp.route("/setup", methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        content = request.form.get('terms', '')
-        save_text_file(search_file_path, content)
-        update_search_terms()
+        terms_file = request.files.get('terms_file')
+        if terms_file and terms_file.filename:
+            search_terms.import_terms(terms_file.stream)
+        else:
+            content = request.form.get('terms', '')
+            save_text_file(search_file_path, content)
+            update_search_terms()
         return redirect(url_for("review.index"))
 
     return render_template_string(
         TXT_SETUP_PAGE_HTML,
         project_name=project_name,
-        terms="\n".join(txt_terms)
+        terms="\n".join(read_search_terms(search_file_path, []))
     )
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from utils.common_utils import project_name, create_folders_if_not_exist
+from utils.log_utils import logger
+
+blob_folder = f"assets/{project_name}/blob_files"
+manifest_path = os.path.join(blob_folder, "manifest.jsonl")
+
+_manifest: Optional[dict[tuple[str, str], tuple[str, str]]] = None
+_lock = threading.Lock()
+
+
+def get_blob_path(digest: str, extension: str) -> str:
+    return os.path.join(blob_folder, digest[:2], digest[2:4], f"{digest}.{extension}")
+
+
+def _load_manifest() -> dict[tuple[str, str], tuple[str, str]]:
+    global _manifest
+    if _manifest is None:
+        _manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    _manifest[(record['apiType'], str(record['id']))] = (record['sha256'], record['extension'])
+    return _manifest
+
+
+def _save_manifest(manifest: dict[tuple[str, str], tuple[str, str]]):
+    fd, tmp_path = tempfile.mkstemp(dir=blob_folder, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        for (api_type, image_id), (digest, extension) in manifest.items():
+            file.write(json.dumps({'apiType': api_type, 'id': image_id,
+                                   'sha256': digest, 'extension': extension}) + '\n')
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, manifest_path)
+
+
+def find_blob(api_type: str, image_id: str) -> Optional[str]:
+    with _lock:
+        entry = _load_manifest().get((api_type, str(image_id)))
+    if entry is None:
+        return None
+    blob_path = get_blob_path(*entry)
+    return blob_path if os.path.exists(blob_path) else None
+
+
+def store_blob(tmp_path: str, digest: str, extension: str, api_type: str, image_id: str) -> tuple[str, bool]:
+    blob_path = get_blob_path(digest, extension)
+    create_folders_if_not_exist([os.path.dirname(blob_path)])
+
+    with _lock:
+        duplicate = os.path.exists(blob_path)
+        if duplicate:
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, blob_path)
+
+        manifest = _load_manifest()
+        key = (api_type, str(image_id))
+        if manifest.get(key) != (digest, extension):
+            manifest[key] = (digest, extension)
+            with open(manifest_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps({'apiType': api_type, 'id': str(image_id),
+                                       'sha256': digest, 'extension': extension}) + '\n')
+
+    return blob_path, duplicate
+
+
+def link_blob(blob_path: str, image_path: str):
+    create_folders_if_not_exist([os.path.dirname(image_path)])
+    if os.path.exists(image_path):
+        if os.path.samefile(blob_path, image_path):
+            return
+        os.remove(image_path)
+
+    try:
+        os.link(blob_path, image_path)
+    except FileNotFoundError:
+        raise
+    except OSError as e:
+        logger.debug(f"Hardlink failed for {image_path} ({e}), copying instead")
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(image_path), suffix='.part')
+        os.close(fd)
+        try:
+            shutil.copyfile(blob_path, tmp_path)
+            os.replace(tmp_path, image_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def release_images(items: list[tuple[str, str, str]]) -> int:
+    orphaned = set()
+    with _lock:
+        manifest = _load_manifest()
+        for image_path, api_type, image_id in items:
+            entry = manifest.get((api_type, str(image_id)))
+            blob_path = get_blob_path(*entry) if entry is not None else None
+            if not os.path.exists(image_path):
+                continue
+            linked = blob_path is not None and os.path.exists(blob_path) and os.path.samefile(blob_path, image_path)
+            os.remove(image_path)
+            if linked and os.stat(blob_path).st_nlink == 1:
+                os.remove(blob_path)
+                orphaned.add(entry)
+
+        if orphaned:
+            for key in [key for key, entry in manifest.items() if entry in orphaned]:
+                del manifest[key]
+            _save_manifest(manifest)
+
+    if orphaned:
+        logger.info(f"Removed {len(orphaned)} unreferenced blobs")
+    return len(orphaned)
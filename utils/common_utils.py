@@ -1,12 +1,12 @@
 import os
-import shutil
-from threading import Timer
-import requests
+import tempfile
+import zipfile
+from typing import Collection, Optional
 from dotenv import load_dotenv
 import json
 import uuid
 
-from flask import send_file, Response
+from flask import Response
 
 from utils.log_utils import logger
 
@@ -21,49 +21,23 @@ app_host = os.getenv('APP_HOST', '0.0.0.0')
 use_debug_mode = os.getenv('DEBUG', 'false').lower() == 'true'
 use_reloader = os.getenv('USE_RELOADER', 'false').lower() == 'true'
 
-
-def get_remote_size(url: str) -> dict:
-    try:
-        head = requests.head(url, timeout=10)
-        cl = head.headers.get('Content-Length')
-        if cl:
-            size_bytes = int(cl)
-            return {
-                'bytes': size_bytes,
-                'kb_decimal': size_bytes / 1000,
-                'kb_binary': size_bytes / 1024,
-                'source': 'Content-Length header'
-            }
-    except Exception:
-        pass
-
-    size = 0
-    try:
-        with requests.get(url, stream=True, timeout=30) as r:
-            r.raise_for_status()
-            for chunk in r.iter_content(8192):
-                if chunk:
-                    size += len(chunk)
-    except Exception:
-        print(f"Could not determine size for URL: {url}")  # Optional: log the error
-        pass
-
-    return {
-        'bytes': size,
-        'kb_decimal': size / 1000 if size > 0 else 0,
-        'kb_binary': size / 1024 if size > 0 else 0,
-        'source': 'streamed download'
-    }
+STORED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp', 'mp4', 'webm', 'zip'}
+ZIP_EXCLUDED_FOLDERS = {'tmp_files', 'thumb_files', 'blob_files', 'job_files', 'profile_files'}
+ZIP_EXCLUDED_FILES = {'search_cache.sqlite3', 'search_cache.sqlite3-wal', 'search_cache.sqlite3-shm'}
+ZIP_CHUNK_SIZE = 256 * 1024
 
 
 def term_to_folder_name(term: str) -> str:
     return term.replace(' ', '_').lower()
 
 
+def terms_to_folder_names(terms: list[str]) -> list[str]:
+    return [term_to_folder_name(term) for term in terms]
+
+
 def create_folders_if_not_exist(folder_names: list[str]):
     for folder_name in folder_names:
-        if not os.path.exists(folder_name):
-            os.makedirs(folder_name)
+        os.makedirs(folder_name, exist_ok=True)
 
 
 def create_files_if_not_exist(file_paths: list[str]):
@@ -73,7 +47,8 @@ def create_files_if_not_exist(file_paths: list[str]):
                 file.write('')
 
 
-def read_search_terms(file_path: str, remove_keys: list[str]) -> list[str]:
+def read_search_terms(file_path: str, remove_keys: Collection[str]) -> list[str]:
+    remove_keys = remove_keys if isinstance(remove_keys, (set, frozenset)) else set(remove_keys)
     with open(file_path, 'r') as file:
         terms = [line.strip() for line in file if line.strip()
                  and term_to_folder_name(line.strip()) not in remove_keys]
@@ -91,8 +66,17 @@ def read_json_file(file_path: str) -> dict:
 
 
 def save_json_file(file_path: str, data: dict):
-    with open(file_path, 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=4)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 def save_text_file(file_path: str, data: str):
@@ -114,15 +98,82 @@ def delete_files_if_exist(folder_path: str):
                 os.remove(file_path)
 
 
-def get_project_folder_as_zip() -> tuple[Response, int]:
+class _ZipStream:
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_project_files(source_dir: str, api_type: Optional[str] = None, term: Optional[str] = None,
+                       file_types: Optional[set[str]] = None):
+    for root, dirs, files in os.walk(source_dir):
+        rel_root = os.path.relpath(root, source_dir)
+        parts = [] if rel_root == '.' else rel_root.split(os.sep)
+        if parts and parts[0] in ZIP_EXCLUDED_FOLDERS:
+            dirs[:] = []
+            continue
+        dirs.sort()
+
+        if parts and parts[0] in ('image_files', 'video_files'):
+            if api_type and len(parts) > 1 and parts[1] != api_type:
+                dirs[:] = []
+                continue
+            if term and len(parts) > 2 and parts[2] != term:
+                dirs[:] = []
+                continue
+
+        for file_name in sorted(files):
+            extension = file_name.rsplit('.', 1)[-1].lower()
+            if file_name in ZIP_EXCLUDED_FILES or (file_types and extension not in file_types):
+                continue
+            if parts and parts[0] in ('image_files', 'video_files') and (api_type or term) and len(parts) < 3:
+                continue
+            yield os.path.join(root, file_name), '/'.join(parts + [file_name])
+
+
+def iter_project_zip(source_dir: str, api_type: Optional[str] = None, term: Optional[str] = None,
+                     file_types: Optional[set[str]] = None):
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as archive:
+        for file_path, arc_name in iter_project_files(source_dir, api_type, term, file_types):
+            info = zipfile.ZipInfo.from_file(file_path, arc_name)
+            extension = arc_name.rsplit('.', 1)[-1].lower()
+            info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            with open(file_path, 'rb') as source, archive.open(info, 'w', force_zip64=True) as target:
+                while chunk := source.read(ZIP_CHUNK_SIZE):
+                    target.write(chunk)
+                    data = sink.pop()
+                    if data:
+                        yield data
+            yield sink.pop()
+    yield sink.pop()
+
+
+def get_project_folder_as_zip(api_type: Optional[str] = None, term: Optional[str] = None,
+                              file_types: Optional[set[str]] = None) -> tuple[Response, int]:
     source_dir = f"assets/{project_name}"
-    zip_filename = f"{project_name}_assets"
-    zip_path = f"assets/zip_files/{zip_filename}"
+    name_parts = [project_name, api_type, term, 'assets']
+    zip_filename = '_'.join(part for part in name_parts if part)
 
-    shutil.make_archive(zip_path, 'zip', source_dir)
-    # delete the zip file after 120 seconds
-    Timer(120, delete_file_if_exists, args=[f"{zip_path}.zip"]).start()
-    return send_file(f"{zip_path}.zip", as_attachment=True), 200
+    response = Response(iter_project_zip(source_dir, api_type, term, file_types), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="{zip_filename}.zip"'
+    return response, 200
 
 
 def get_image_url(img: dict) -> str:
@@ -0,0 +1,289 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from utils.blob_store import find_blob, store_blob, link_blob
+from utils.common_utils import create_folders_if_not_exist, project_name
+from utils.log_utils import logger
+from utils.metrics import downloads, download_bytes, download_seconds
+from utils.rate_limit_utils import acquire_download, record_response
+from utils.transcode_utils import (transcode_enabled, transcode_max_source_mb, transcode_to_budget,
+                                   get_transcode_format, transcode_workers)
+
+load_dotenv()
+
+max_image_kb = int(os.getenv('MAX_KB_IMAGE_SIZE', '512'))
+download_workers = int(os.getenv('DOWNLOAD_WORKERS', '8'))
+chunk_size = 64 * 1024
+rate_limit_retries = int(os.getenv('DOWNLOAD_RATE_LIMIT_RETRIES', '3'))
+tmp_folder = f"assets/{project_name}/tmp_files"
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_global_slots = threading.BoundedSemaphore(download_workers)
+_provider_slots: dict[str, threading.BoundedSemaphore] = {}
+_provider_slots_lock = threading.Lock()
+_image_locks = [threading.Lock() for _ in range(256)]
+
+
+@dataclass
+class DownloadTask:
+    api_type: str
+    image_id: str
+    urls: list[str]
+    folder: str
+    extension: str
+
+
+@dataclass
+class DownloadResult:
+    task: DownloadTask
+    status: str
+    size_bytes: int = 0
+    path: Optional[str] = None
+    reason: str = ''
+    seconds: float = 0.0
+
+
+@dataclass
+class DownloadStats:
+    downloaded: int = 0
+    deduplicated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    total_bytes: int = 0
+    elapsed: float = 0.0
+
+    def add(self, result: DownloadResult):
+        if result.status == 'downloaded':
+            self.downloaded += 1
+            self.total_bytes += result.size_bytes
+        elif result.status == 'deduplicated':
+            self.deduplicated += 1
+        elif result.status == 'skipped':
+            self.skipped += 1
+        else:
+            self.failed += 1
+
+    @property
+    def images_per_second(self) -> float:
+        return self.downloaded / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.total_bytes / 1_000_000 / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def get_provider_workers(api_type: str) -> int:
+    return int(os.getenv(f'{api_type.upper()}_DOWNLOAD_WORKERS', str(download_workers)))
+
+
+def get_session(url: str) -> requests.Session:
+    host = urlparse(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=download_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[host] = session
+    return session
+
+
+def _get_provider_slots(api_type: str) -> threading.BoundedSemaphore:
+    with _provider_slots_lock:
+        slots = _provider_slots.get(api_type)
+        if slots is None:
+            slots = threading.BoundedSemaphore(get_provider_workers(api_type))
+            _provider_slots[api_type] = slots
+    return slots
+
+
+def stream_to_file(url: str, max_bytes: int, api_type: str) -> Optional[tuple[str, int, str]]:
+    acquire_download(api_type)
+    with get_session(url).get(url, stream=True, timeout=30) as response:
+        record_response(f"{api_type}_download", response)
+        response.raise_for_status()
+        content_length = response.headers.get('Content-Length')
+        if content_length and int(content_length) > max_bytes:
+            return None
+
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_folder, suffix='.part')
+        digest = hashlib.sha256()
+        size = 0
+        completed = False
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in response.iter_content(chunk_size):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        return None
+                    digest.update(chunk)
+                    file.write(chunk)
+            completed = True
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return tmp_path, size, digest.hexdigest()
+
+
+def _stream_with_retry(url: str, api_type: str,
+                       max_bytes: int = max_image_kb * 1000) -> Optional[tuple[str, int, str]]:
+    for attempt in range(rate_limit_retries + 1):
+        try:
+            return stream_to_file(url, max_bytes, api_type)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 429 or attempt == rate_limit_retries:
+                raise
+    return None
+
+
+def get_image_path(task: DownloadTask) -> str:
+    return os.path.join(task.folder, f"{task.image_id}.{task.extension}")
+
+
+def download_task(task: DownloadTask) -> DownloadResult:
+    create_folders_if_not_exist([task.folder, tmp_folder])
+    image_path = get_image_path(task)
+
+    with _image_locks[hash((task.api_type, task.image_id)) % len(_image_locks)]:
+        blob_path = find_blob(task.api_type, task.image_id)
+        if blob_path is not None:
+            try:
+                link_blob(blob_path, image_path)
+                logger.info(f"Linked image {task.image_id} to {image_path} from existing blob")
+                return DownloadResult(task, 'deduplicated', path=image_path, reason='known_id')
+            except FileNotFoundError:
+                logger.info(f"Blob for image {task.image_id} was removed, downloading it again")
+
+        return _download_variants(task, image_path)
+
+
+def _download_variants(task: DownloadTask, image_path: str) -> DownloadResult:
+    error = None
+    for url in task.urls:
+        if not url:
+            continue
+        try:
+            downloaded = _stream_with_retry(url, task.api_type)
+        except requests.RequestException as e:
+            logger.error(f"Error downloading image {task.image_id} from {task.api_type}: {e}")
+            error = str(e)
+            continue
+
+        if downloaded is not None:
+            return _store_download(task, image_path, downloaded)
+
+    if error:
+        return DownloadResult(task, 'failed', reason=error)
+
+    if transcode_enabled and get_transcode_format(task.extension) is not None:
+        return _download_transcode_source(task)
+
+    logger.info(f"Skipped image {task.image_id} (every variant exceeds {max_image_kb} KB limit)")
+    return DownloadResult(task, 'skipped', reason='size_limit')
+
+
+def _store_download(task: DownloadTask, image_path: str, downloaded: tuple[str, int, str],
+                    note: str = '') -> DownloadResult:
+    tmp_path, size_bytes, digest = downloaded
+    blob_path, duplicate = store_blob(tmp_path, digest, task.extension, task.api_type, task.image_id)
+    link_blob(blob_path, image_path)
+    logger.info(f"Downloaded image {task.image_id} to {image_path} ({size_bytes / 1000:.2f} KB{note}"
+                f"{', same content as an existing blob' if duplicate else ''})")
+    return DownloadResult(task, 'downloaded', size_bytes=size_bytes, path=image_path,
+                          reason='same_content' if duplicate else '')
+
+
+def _download_transcode_source(task: DownloadTask) -> DownloadResult:
+    for url in reversed(task.urls):
+        if not url:
+            continue
+        try:
+            downloaded = _stream_with_retry(url, task.api_type, int(transcode_max_source_mb * 1000 * 1000))
+        except requests.RequestException as e:
+            logger.error(f"Error downloading image {task.image_id} from {task.api_type}: {e}")
+            continue
+        if downloaded is not None:
+            tmp_path, size_bytes, _ = downloaded
+            return DownloadResult(task, 'oversized', size_bytes=size_bytes, path=tmp_path)
+
+    logger.info(f"Skipped image {task.image_id} (every variant exceeds {transcode_max_source_mb} MB "
+                f"transcoding limit)")
+    return DownloadResult(task, 'skipped', reason='size_limit')
+
+
+def _transcode(result: DownloadResult) -> DownloadResult:
+    task = result.task
+    try:
+        transcoded = transcode_to_budget(result.path, max_image_kb * 1000, task.extension)
+    except Exception as e:
+        logger.error(f"Error transcoding image {task.image_id} from {task.api_type}: {e}")
+        return DownloadResult(task, 'failed', reason=str(e))
+    finally:
+        os.remove(result.path)
+
+    if transcoded is None:
+        logger.info(f"Skipped image {task.image_id} (could not re-encode it below {max_image_kb} KB)")
+        return DownloadResult(task, 'skipped', reason='size_limit')
+    return _store_download(task, get_image_path(task), transcoded,
+                           note=f", re-encoded from {result.size_bytes / 1000:.2f} KB")
+
+
+def _run_task(task: DownloadTask, should_stop: Optional[Callable[[], bool]] = None) -> Optional[DownloadResult]:
+    if should_stop is not None and should_stop():
+        return None
+    start = time.perf_counter()
+    with _get_provider_slots(task.api_type), _global_slots:
+        try:
+            result = download_task(task)
+        except Exception as e:
+            logger.error(f"Unexpected error downloading image {task.image_id} from {task.api_type}: {e}")
+            result = DownloadResult(task, 'failed', reason=str(e))
+    if result.status == 'oversized':
+        result = _transcode(result)
+
+    result.seconds = time.perf_counter() - start
+    download_seconds.observe(result.seconds, task.api_type)
+    downloads.inc(task.api_type, result.status, 'error' if result.status == 'failed' else result.reason or 'none')
+    if result.size_bytes:
+        download_bytes.inc(task.api_type, amount=result.size_bytes)
+    return result
+
+
+def download_images(tasks: list[DownloadTask], on_result: Optional[Callable[[DownloadResult], None]] = None,
+                    should_stop: Optional[Callable[[], bool]] = None) -> DownloadStats:
+    stats = DownloadStats()
+    if not tasks:
+        return stats
+
+    start = time.perf_counter()
+    workers = download_workers + transcode_workers if transcode_enabled else download_workers
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        futures = [executor.submit(_run_task, task, should_stop) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            if result is None:
+                continue
+            stats.add(result)
+            if on_result is not None:
+                on_result(result)
+    stats.elapsed = time.perf_counter() - start
+
+    logger.info(f"Downloaded {stats.downloaded} images ({stats.deduplicated} deduplicated, "
+                f"{stats.skipped} skipped, {stats.failed} failed) "
+                f"in {stats.elapsed:.2f}s - {stats.images_per_second:.2f} images/s, "
+                f"{stats.mb_per_second:.2f} MB/s")
+    return stats
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 import requests
 from bs4 import BeautifulSoup
 import re
@@ -8,7 +9,12 @@ import base64
 from io import BytesIO
 import json
 
-from utils.common_utils import get_remote_size, term_to_folder_name, read_json_file
+from utils.common_utils import term_to_folder_name, read_json_file
+from utils.download_utils import DownloadTask, DownloadStats, download_images, get_session
+from utils.log_utils import logger
+from utils.metrics import search_seconds
+from utils.rate_limit_utils import acquire_search, record_response
+from utils.search_cache import cached_search
 
 load_dotenv()
 
@@ -21,7 +27,6 @@ class FlickerImage:
     url: str
     hi_res_url: str
     asset_path: str
-    base64_data: str
 
 
 HEADERS = {
@@ -29,42 +34,54 @@ HEADERS = {
 }
 
 
-def get_image_from_flickr(query, limit=15) -> list[FlickerImage]:
+def fetch_flickr_search(query) -> tuple[Optional[list[str]], None, bool]:
     params = {
         "text": query,
         "license": "4,5,6,9,10"
     }
 
+    if not acquire_search('flickr'):
+        return None, None, False
+
     try:
         r = requests.get(scrapper_url, params=params, headers=HEADERS, timeout=30)
+        record_response('flickr', r)
         r.raise_for_status()
     except requests.RequestException as e:
-        print(f"Error fetching images from Flickr for query '{query}': {e}")
-        return []
+        logger.error(f"Error fetching images from Flickr for query '{query}': {e}")
+        return None, None, False
 
     soup = BeautifulSoup(r.text, "html.parser")
+    sources = [img.get("src") for img in soup.find_all("img")
+               if img.get("src") and "staticflickr.com" in img.get("src")]
+    return sources, None, False
+
+
+@search_seconds.time('flickr')
+def get_image_from_flickr(query, limit=15) -> list[FlickerImage]:
+    sources = cached_search('flickr', query, 1, limit, lambda etag: fetch_flickr_search(query))
+    if not sources:
+        return []
 
     images = []
+    seen_ids = set()
 
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        if not src:
+    for src in sources:
+        hi_res = re.sub(r"_[a-z]\.jpg", "_b.jpg", src)
+        img_id = hi_res.split("/")[-1].split("_")[0]
+        if img_id in seen_ids:
             continue
+        seen_ids.add(img_id)
+        images.append(FlickerImage(
+            id=img_id,
+            url=src if src.startswith('http') else f"https:{src}",
+            hi_res_url=hi_res if hi_res.startswith('http') else f"https:{hi_res}",
+            asset_path=f"{term_to_folder_name(query)}/{img_id}.jpg"
+        ))
+        if len(images) >= limit:
+            break
 
-        if "staticflickr.com" in src:
-            hi_res = re.sub(r"_[a-z]\.jpg", "_b.jpg", src)
-            img_id = hi_res.split("/")[-1].split("_")[0]
-            if any(existing_img.id == img_id for existing_img in images):
-                continue
-            images.append(FlickerImage(
-                id=img_id,
-                url=f"https:{src}",
-                hi_res_url=f"https:{hi_res}",
-                asset_path=f"{term_to_folder_name(query)}/{img_id}.jpg",
-                base64_data=convert_image_to_base64(f"https:{hi_res}")
-            ))
-
-    return images[:limit]
+    return images
 
 
 def convert_flickr_image_to_json(img: FlickerImage) -> dict:
@@ -73,33 +90,24 @@ def convert_flickr_image_to_json(img: FlickerImage) -> dict:
         'url': img.url,
         'highResUrl': img.hi_res_url,
         'assetPath': img.asset_path,
-        'base64Data': '',
         'apiType': 'flickr'
     }
 
 
-def download_flickr_images(image_list: list[FlickerImage], folder_name: str):
-    for img in image_list:
-        url = img.hi_res_url
-        image_info = get_remote_size(url)
-        content_kb = image_info.get('kb_decimal', 0)
-        if content_kb <= int(os.getenv('MAX_KB_IMAGE_SIZE', '512')):
-            try:
-                image_data = requests.get(url, timeout=30)
-            except requests.RequestException as e:
-                print(f"Error downloading image {img.id} from Flickr: {e}")
-                return
-            extension = url.split('.')[-1]
-            image_path = os.path.join(folder_name, f"{img.id}.{extension}")
-            with open(image_path, 'wb') as file:
-                file.write(image_data.content)
-            print(f"Downloaded image {img.id} to {image_path} ({content_kb:.2f} KB)")
-        else:
-            print(f"Skipped image {img.id} ({content_kb:.2f} KB exceeds limit)")
+def get_flickr_download_task(img: FlickerImage, folder_name: str) -> DownloadTask:
+    return DownloadTask(api_type='flickr',
+                        image_id=img.id,
+                        urls=[img.hi_res_url],
+                        folder=folder_name,
+                        extension=img.hi_res_url.split('.')[-1])
+
+
+def download_flickr_images(image_list: list[FlickerImage], folder_name: str) -> DownloadStats:
+    return download_images([get_flickr_download_task(img, folder_name) for img in image_list])
 
 
 def convert_image_to_base64(url: str) -> str:
-    response = requests.get(url, timeout=30)
+    response = get_session(url).get(url, timeout=30)
     response.raise_for_status()
     image_data = BytesIO(response.content)
     encoded_string = base64.b64encode(image_data.getvalue()).decode('utf-8')
@@ -115,21 +123,16 @@ def fix_asset_paths_of_json(json_file: str):
 
             if img_data.get('assetPath', None) is None:
                 img_data['assetPath'] = f"{term_to_folder_name(term)}/{img_data['id']}.jpg"
-                print(f"Fixed assetPath for {img_data['id']} to {img_data['assetPath']}")
+                logger.info(f"Fixed assetPath for {img_data['id']} to {img_data['assetPath']}")
 
     with open(json_file, 'w') as file:
         json.dump(image_list, file, indent=4)
 
 
-def download_flicker_images_from_json(json_file: str, folder_name: str):
-    image_list = read_json_file(json_file)
+def get_flickr_download_tasks(image_list: dict, folder_name: str) -> list[DownloadTask]:
+    tasks = []
     for term, images in image_list.items():
         term_folder = os.path.join(folder_name, term_to_folder_name(term))
-        img_types = set(img.get('apiType') for img in images)
-
-        if not os.path.exists(term_folder) and 'flickr' in img_types:
-            os.makedirs(term_folder)
-
         for img_data in images:
             if img_data.get('apiType') != 'flickr':
                 continue
@@ -138,11 +141,12 @@ def download_flicker_images_from_json(json_file: str, folder_name: str):
                 id=img_data['id'],
                 url=img_data['url'],
                 hi_res_url=img_data['highResUrl'],
-                asset_path=img_data.get('assetPath', ''),
-                base64_data=img_data.get('base64Data', '')
+                asset_path=img_data.get('assetPath', '')
             )
+            tasks.append(get_flickr_download_task(img, term_folder))
+
+    return tasks
 
-            if img_data.get('assetPath', None) is None:
-                print(f"Error at {img_data['id']} path is None")
 
-            download_flickr_images([img], term_folder)
+def download_flicker_images_from_json(json_file: str, folder_name: str) -> DownloadStats:
+    return download_images(get_flickr_download_tasks(read_json_file(json_file), folder_name))
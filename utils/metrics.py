@@ -0,0 +1,146 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Iterable
+
+default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: list['Metric'] = []
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                                for key, value in values]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = default_buckets):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(label_values)
+            if counts is None:
+                counts = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts[0][idx] += 1
+            counts[1] += value
+
+    def time(self, *label_values) -> Callable:
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *label_values)
+            return wrapper
+        return decorator
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = self.header()
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def _sample_lines(name: str, help_text: str, kind: str, samples: Iterable[tuple[dict, float]]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+    return lines
+
+
+def gauge_lines(name: str, help_text: str, samples: Iterable[tuple[dict, float]]) -> list[str]:
+    return _sample_lines(name, help_text, 'gauge', samples)
+
+
+def counter_lines(name: str, help_text: str, samples: Iterable[tuple[dict, float]]) -> list[str]:
+    return _sample_lines(name, help_text, 'counter', samples)
+
+
+def register_collector(collector: Callable[[], Iterable[str]]):
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return '\n'.join(lines) + '\n'
+
+
+search_seconds = Histogram('media_search_seconds', 'Provider search latency, including the search cache',
+                           ('provider',))
+search_cache_lookups = Counter('media_search_cache_lookups_total', 'Search cache lookups by outcome',
+                               ('provider', 'result'))
+http_requests = Counter('media_http_requests_total', 'Outgoing provider HTTP requests',
+                        ('target', 'method', 'status'))
+http_response_bytes = Counter('media_http_response_bytes_total',
+                              'Declared Content-Length of provider HTTP responses', ('target', 'method'))
+downloads = Counter('media_downloads_total', 'Image download outcomes', ('provider', 'status', 'reason'))
+download_bytes = Counter('media_download_bytes_total', 'Image bytes written to disk', ('provider',))
+download_seconds = Histogram('media_download_seconds', 'Time to fetch and store one image', ('provider',))
+persist_seconds = Histogram('media_persist_seconds', 'Image map persistence time', ('operation',),
+                            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+route_seconds = Histogram('media_route_seconds', 'Request latency per route', ('endpoint', 'method', 'status'))
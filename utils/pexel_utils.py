@@ -1,58 +1,135 @@
-from dotenv import load_dotenv
-from pexels_api import API
 import os
+from dataclasses import dataclass, field
+from typing import Optional
+
 import requests
-from pexels_api.tools import Photo
-from utils.common_utils import get_remote_size, read_json_file, create_folders_if_not_exist
+from dotenv import load_dotenv
+
+from utils.common_utils import read_json_file
+from utils.download_utils import DownloadTask, DownloadStats, download_images, get_session
+from utils.rate_limit_utils import acquire_search, record_response
+from utils.search_cache import cached_search
 from utils.log_utils import logger
+from utils.metrics import search_seconds
 
 load_dotenv()
 
+pexels_api_url = os.getenv('PEXELS_API_URL', 'https://api.pexels.com/v1').rstrip('/')
 pexels_api_key = os.getenv('PEXELS_API_KEY')
 if not pexels_api_key:
     raise EnvironmentError(
         "Environment variable `PEXELS_API_KEY` is not set. Set it in the environment or in a `.env` file.")
-pexels_api = API(pexels_api_key)
-max_image_kb = int(os.getenv('MAX_KB_IMAGE_SIZE', '512'))
 
 
-def get_image_from_pexels(term, page_idx=1, results_per_page=15) -> list[Photo]:
+@dataclass(slots=True)
+class PexelsPhoto:
+    id: int
+    width: int
+    height: int
+    url: str
+    photographer: str
+    original: str
+    large2x: Optional[str] = None
+    large: Optional[str] = None
+    medium: Optional[str] = None
+    small: Optional[str] = None
+    portrait: Optional[str] = None
+    landscape: Optional[str] = None
+    tiny: Optional[str] = None
+    alt: Optional[str] = None
+
+    @property
+    def description(self) -> str:
+        return self.url.rstrip('/').split('/')[-1].replace(f"-{self.id}", "")
+
+    @property
+    def compressed(self) -> str:
+        return f"{self.original}?auto=compress"
+
+    @property
+    def extension(self) -> str:
+        return self.original.split('?')[0].split('.')[-1]
+
+
+@dataclass(slots=True)
+class PexelsSearchPage:
+    page: int
+    per_page: int
+    total_results: int
+    next_page: Optional[str] = None
+    photos: list[PexelsPhoto] = field(default_factory=list)
+
+
+def get_pexels_photo_from_api_result(item: dict) -> PexelsPhoto:
+    src = item.get('src', {})
+    return PexelsPhoto(id=int(item['id']),
+                       width=int(item.get('width', 0)),
+                       height=int(item.get('height', 0)),
+                       url=item.get('url', ''),
+                       photographer=item.get('photographer', ''),
+                       original=src['original'],
+                       large2x=src.get('large2x'),
+                       large=src.get('large'),
+                       medium=src.get('medium'),
+                       small=src.get('small'),
+                       portrait=src.get('portrait'),
+                       landscape=src.get('landscape'),
+                       tiny=src.get('tiny'),
+                       alt=item.get('alt'))
+
+
+def fetch_pexels_search(term, page_idx=1, results_per_page=15) -> tuple[Optional[dict], None, bool]:
+    url = f"{pexels_api_url}/search"
+    params = {'query': term, 'page': page_idx, 'per_page': results_per_page}
+    if not acquire_search('pexels'):
+        return None, None, False
+
     try:
-        pexels_api.search(term, page=page_idx, results_per_page=results_per_page)
-        photo_list = pexels_api.get_entries()
-    except Exception as e:
+        response = get_session(url).get(url, params=params, headers={'Authorization': pexels_api_key}, timeout=30)
+        record_response('pexels', response)
+        response.raise_for_status()
+        return response.json(), None, False
+    except (requests.RequestException, ValueError) as e:
         logger.error(f"Error fetching images from Pexels for term '{term}': {e}")
-        return []
+        return None, None, False
 
-    return photo_list
 
+def get_pexels_search_page(term, page_idx=1, results_per_page=15) -> Optional[PexelsSearchPage]:
+    data = cached_search('pexels', term, page_idx, results_per_page,
+                         lambda etag: fetch_pexels_search(term, page_idx, results_per_page))
+    if not data:
+        return None
 
-def download_pexels_images(photo_list: list[Photo], folder_name: str):
-    for photo in photo_list:
-        url_list = [photo.original, photo.large2x, photo.large, photo.medium, photo.small]
-        url_indx = 0
-        content_kb = 0
-        while url_indx < len(url_list):
-            image_info = get_remote_size(url_list[url_indx])
-            content_kb = image_info.get('kb_decimal', 0)
-            if content_kb <= max_image_kb:
-                break
-            url_indx += 1
+    return PexelsSearchPage(page=int(data.get('page', page_idx)),
+                            per_page=int(data.get('per_page', results_per_page)),
+                            total_results=int(data.get('total_results', 0)),
+                            next_page=data.get('next_page'),
+                            photos=[get_pexels_photo_from_api_result(item) for item in data.get('photos', [])])
 
-        try:
-            image_data = requests.get(url_list[url_indx], timeout=30)
-        except requests.RequestException as e:
-            logger.error(f"Error downloading image {photo.id} from Pexels: {e}")
-            return
 
-        image_path = os.path.join(folder_name, f"{photo.id}.{photo.extension}")
-        with open(image_path, 'wb') as file:
-            file.write(image_data.content)
+@search_seconds.time('pexels')
+def get_pexels_photos_page(term, page_idx=1, results_per_page=15) -> tuple[list[PexelsPhoto], Optional[bool]]:
+    page = get_pexels_search_page(term, page_idx, results_per_page)
+    if page is None:
+        return [], None
+    return page.photos, page.next_page is not None and page.page * page.per_page < page.total_results
 
-        logger.info(f"Downloaded image {photo.id} to {image_path} ({content_kb:.2f} KB)")
 
+def get_image_from_pexels(term, page_idx=1, results_per_page=15) -> list[PexelsPhoto]:
+    return get_pexels_photos_page(term, page_idx, results_per_page)[0]
 
-def convert_pexels_photo_to_json(img: Photo) -> dict:
+
+def download_pexels_images(photo_list: list[PexelsPhoto], folder_name: str) -> DownloadStats:
+    tasks = [DownloadTask(api_type='pexels',
+                          image_id=str(photo.id),
+                          urls=[url for url in (photo.original, photo.large2x, photo.large, photo.medium, photo.small) if url],
+                          folder=folder_name,
+                          extension=photo.extension)
+             for photo in photo_list]
+    return download_images(tasks)
+
+
+def convert_pexels_photo_to_json(img: PexelsPhoto) -> dict:
     return {
         'id': img.id,
         'width': img.width,
@@ -74,35 +151,15 @@ def convert_pexels_photo_to_json(img: Photo) -> dict:
     }
 
 
-def download_pexels_images_from_json(json_file: str, folder_name: str):
-    data = read_json_file(json_file)
-    for term, images in data.items():
-        for img_data in images:
-            if img_data.get('apiType') != 'pexels':
-                continue
-
-            url = img_data['original']
-            image_info = get_remote_size(url)
-            content_kb = image_info.get('kb_decimal', 0)
-
-            if content_kb > max_image_kb:
-                url = img_data['large2x']
-                image_info = get_remote_size(url)
-                content_kb = image_info.get('kb_decimal', 0)
-
-            if content_kb > max_image_kb:
-                url = img_data['large']
-                image_info = get_remote_size(url)
-                content_kb = image_info.get('kb_decimal', 0)
-
-            if content_kb <= max_image_kb:
-                image_data = requests.get(url, timeout=30)
-                folder_path = os.path.join(folder_name, term)
-                image_path = os.path.join(folder_path, f"{img_data['id']}.{img_data['extension']}")
-
-                create_folders_if_not_exist([folder_path])
-                with open(image_path, 'wb') as file:
-                    file.write(image_data.content)
-                logger.info(f"Downloaded image {img_data['id']} to {image_path} ({content_kb:.2f} KB)")
-            else:
-                logger.info(f"Skipped image {img_data['id']} ({content_kb:.2f} KB exceeds limit)")
+def get_pexels_download_tasks(data: dict, folder_name: str) -> list[DownloadTask]:
+    return [DownloadTask(api_type='pexels',
+                         image_id=str(img_data['id']),
+                         urls=[img_data['original'], img_data['large2x'], img_data['large']],
+                         folder=os.path.join(folder_name, term),
+                         extension=img_data['extension'])
+            for term, images in data.items()
+            for img_data in images if img_data.get('apiType') == 'pexels']
+
+
+def download_pexels_images_from_json(json_file: str, folder_name: str) -> DownloadStats:
+    return download_images(get_pexels_download_tasks(read_json_file(json_file), folder_name))
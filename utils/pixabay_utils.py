@@ -2,8 +2,14 @@ import os
 import requests
 from dotenv import load_dotenv
 from dataclasses import dataclass
+from typing import Optional
 
-from utils.common_utils import get_remote_size, read_json_file
+from utils.common_utils import read_json_file
+from utils.download_utils import DownloadTask, DownloadStats, download_images
+from utils.log_utils import logger
+from utils.metrics import search_seconds
+from utils.rate_limit_utils import acquire_search, record_response
+from utils.search_cache import cached_search
 
 load_dotenv()
 
@@ -13,7 +19,6 @@ if not pixabay_api_key or not pixabay_api_url:
     raise EnvironmentError(
         "Environment variables `PIXABAY_API_KEY` "
         "or `PIXABAY_API_URL` are not set. Set them in the environment or in a `.env` file.")
-max_image_kb = int(os.getenv('MAX_KB_IMAGE_SIZE', '512'))
 
 
 @dataclass
@@ -45,7 +50,8 @@ def get_extension_from_url(url: str):
     return url.split('.')[-1]
 
 
-def get_image_from_pixabay(term, page_idx=1, results_per_page=15) -> list[PixabayImage]:
+def fetch_pixabay_search(term, page_idx=1, results_per_page=15,
+                         etag=None) -> tuple[Optional[dict], Optional[str], bool]:
     params = {
         'key': pixabay_api_key,
         'q': term,
@@ -53,17 +59,33 @@ def get_image_from_pixabay(term, page_idx=1, results_per_page=15) -> list[Pixaba
         'per_page': results_per_page,
         'image_type': 'photo',
     }
+    headers = {'If-None-Match': etag} if etag else {}
+    if not acquire_search('pixabay'):
+        return None, None, False
 
     try:
-        response = requests.get(pixabay_api_url, params=params, timeout=30)
+        response = requests.get(pixabay_api_url, params=params, headers=headers, timeout=30)
+        record_response('pixabay', response)
+        if response.status_code == 304:
+            return None, etag, True
         response.raise_for_status()
     except requests.RequestException as e:
-        print(f"Error fetching images from Pixabay for term '{term}': {e}")
-        return []
+        logger.error(f"Error fetching images from Pixabay for term '{term}': {e}")
+        return None, None, False
 
     data = response.json()
     if 'error' in data:
         raise Exception(f"Pixabay API error: {data['error']}")
+    return data, response.headers.get('ETag'), False
+
+
+@search_seconds.time('pixabay')
+def get_image_from_pixabay(term, page_idx=1, results_per_page=15) -> list[PixabayImage]:
+    data = cached_search('pixabay', term, page_idx, results_per_page,
+                         lambda etag: fetch_pixabay_search(term, page_idx, results_per_page, etag))
+    if not data:
+        return []
+
     image_list = []
     for item in data.get('hits', []):
         img = PixabayImage(
@@ -93,25 +115,16 @@ def get_image_from_pixabay(term, page_idx=1, results_per_page=15) -> list[Pixaba
     return image_list
 
 
-def download_pixabay_images(image_list: list[PixabayImage], folder_name: str):
-    for img in image_list:
-        url = img.largeImageURL
-        image_info = get_remote_size(url)
-        content_kb = image_info.get('kb_decimal', 0)
-        if content_kb <= max_image_kb:
-            try:
-                image_data = requests.get(url, timeout=30)
-            except requests.RequestException as e:
-                print(f"Error downloading image {img.id} from Pixabay: {e}")
-                return
+def get_pixabay_download_task(img: PixabayImage, folder_name: str) -> DownloadTask:
+    return DownloadTask(api_type='pixabay',
+                        image_id=str(img.id),
+                        urls=[img.largeImageURL, img.webformatURL],
+                        folder=folder_name,
+                        extension=get_extension_from_url(img.largeImageURL))
 
-            extension = get_extension_from_url(url)
-            image_path = os.path.join(folder_name, f"{img.id}.{extension}")
-            with open(image_path, 'wb') as file:
-                file.write(image_data.content)
-            print(f"Downloaded image {img.id} to {image_path} ({content_kb:.2f} KB)")
-        else:
-            print(f"Skipped image {img.id} ({content_kb:.2f} KB exceeds limit)")
+
+def download_pixabay_images(image_list: list[PixabayImage], folder_name: str) -> DownloadStats:
+    return download_images([get_pixabay_download_task(img, folder_name) for img in image_list])
 
 
 def convert_pixabay_image_to_json(img: PixabayImage) -> dict:
@@ -168,10 +181,11 @@ def convert_json_to_pixabay_image(img_data: dict) -> PixabayImage:
     )
 
 
-def download_pixabay_images_from_json(json_file: str, folder_name: str):
-    json_data = read_json_file(json_file)
+def get_pixabay_download_tasks(json_data: dict, folder_name: str) -> list[DownloadTask]:
+    return [get_pixabay_download_task(convert_json_to_pixabay_image(img_data), os.path.join(folder_name, term))
+            for term, images in json_data.items()
+            for img_data in images if img_data.get('apiType') == 'pixabay']
+
 
-    for term, images in json_data.items():
-        pixabay_images = [convert_json_to_pixabay_image(img_data) for img_data in images if
-                          img_data.get('apiType') == 'pixabay']
-        download_pixabay_images(pixabay_images, folder_name)
+def download_pixabay_images_from_json(json_file: str, folder_name: str) -> DownloadStats:
+    return download_images(get_pixabay_download_tasks(read_json_file(json_file), folder_name))
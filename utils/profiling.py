@@ -0,0 +1,139 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from utils.common_utils import project_name, create_folders_if_not_exist
+
+load_dotenv()
+
+profiling_enabled = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+sample_interval_ms = float(os.getenv('PROFILING_SAMPLE_INTERVAL_MS', '10'))
+profile_folder = f"assets/{project_name}/profile_files"
+tracemalloc_frames = 10
+
+
+def profile_file_path(name: str, extension: str) -> str:
+    create_folders_if_not_exist([profile_folder])
+    safe_name = "".join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+    return os.path.join(profile_folder, f"{time.strftime('%Y%m%d_%H%M%S')}_{safe_name}.{extension}")
+
+
+def save_profile(profile: cProfile.Profile, name: str, limit: int = 40) -> tuple[str, str]:
+    path = profile_file_path(name, 'prof')
+    profile.dump_stats(path)
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats('cumulative').print_stats(limit)
+    return path, output.getvalue()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = sample_interval_ms):
+        self.interval = interval_ms / 1000
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self._stacks = Counter()
+            self._samples = 0
+            self._started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            names.update((thread.ident, thread.name) for thread in threading.enumerate())
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[';'.join(reversed(stack))] += 1
+            self._samples += 1
+
+    def stop(self) -> Optional[tuple[str, str]]:
+        with self._lock:
+            if not self.running:
+                return None
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        collapsed = '\n'.join(f"{stack} {count}" for stack, count in self._stacks.most_common())
+        path = profile_file_path('sampling', 'collapsed')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(collapsed + '\n')
+        return path, collapsed
+
+    def status(self) -> dict:
+        return {'running': self.running, 'samples': self._samples, 'interval_ms': self.interval * 1000,
+                'started_at': self._started_at if self._started_at else None}
+
+
+class MemoryTracker:
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(tracemalloc_frames)
+            self._baseline = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        return {'traced_bytes': current, 'peak_bytes': peak}
+
+    def diff(self, limit: int = 30, group_by: str = 'lineno') -> Optional[str]:
+        with self._lock:
+            if self._baseline is None or not tracemalloc.is_tracing():
+                return None
+            snapshot = tracemalloc.take_snapshot()
+            stats = snapshot.compare_to(self._baseline, group_by)
+            current, peak = tracemalloc.get_traced_memory()
+        lines = [f"traced={current} bytes peak={peak} bytes"]
+        lines.extend(str(stat) for stat in stats[:limit])
+        return '\n'.join(lines)
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+sampling_profiler = SamplingProfiler()
+memory_tracker = MemoryTracker()
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from utils.log_utils import logger
+from utils.metrics import http_requests, http_response_bytes
+
+load_dotenv()
+
+search_max_wait = float(os.getenv('SEARCH_RATE_LIMIT_MAX_WAIT', '10'))
+max_backoff_seconds = 300.0
+
+# requests / seconds, overridable with <PROVIDER>_RATE_LIMIT and <PROVIDER>_DOWNLOAD_RATE_LIMIT
+DEFAULT_RATE_LIMITS = {
+    'pexels': '200/3600',
+    'pixabay': '100/60',
+    'unsplash': '50/3600',
+    'flickr': '60/60',
+    'pexels_download': '20/1',
+    'pixabay_download': '20/1',
+    'unsplash_download': '20/1',
+    'flickr_download': '10/1',
+}
+
+
+class TokenBucket:
+    def __init__(self, requests_count: int, per_seconds: float):
+        self.capacity = float(requests_count)
+        self.max_rate = requests_count / per_seconds
+        self.rate = self.max_rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.quota_reset_at = 0.0
+        self.consecutive_429 = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if self.quota_reset_at and now >= self.quota_reset_at:
+            self.tokens = self.capacity
+            self.rate = self.max_rate
+            self.quota_reset_at = 0.0
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                else:
+                    wait = (1 - self.tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def update_quota(self, remaining: Optional[int], reset_seconds: Optional[float]):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if remaining <= 0 and reset_seconds:
+                    self.blocked_until = max(self.blocked_until, now + reset_seconds)
+                    self.quota_reset_at = self.blocked_until
+            if remaining is not None and reset_seconds and reset_seconds > 0:
+                self.rate = min(self.max_rate, max(remaining, 1) / reset_seconds)
+            else:
+                self.rate = self.max_rate
+            self.consecutive_429 = 0
+
+    def back_off(self, retry_after: Optional[float]):
+        with self._lock:
+            self.consecutive_429 += 1
+            wait = retry_after if retry_after is not None else min(max_backoff_seconds,
+                                                                   2 ** self.consecutive_429)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + wait)
+            self.tokens = 0.0
+        return wait
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(key: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            limit = os.getenv(f'{key.upper()}_RATE_LIMIT', DEFAULT_RATE_LIMITS.get(key, '10/1'))
+            requests_count, per_seconds = limit.split('/')
+            bucket = TokenBucket(int(requests_count), float(per_seconds))
+            _buckets[key] = bucket
+    return bucket
+
+
+_search_wait = threading.local()
+
+
+@contextmanager
+def wait_for_search_tokens() -> Iterator[None]:
+    previous = getattr(_search_wait, 'unbounded', False)
+    _search_wait.unbounded = True
+    try:
+        yield
+    finally:
+        _search_wait.unbounded = previous
+
+
+def acquire_search(provider: str) -> bool:
+    timeout = None if getattr(_search_wait, 'unbounded', False) else search_max_wait
+    if get_bucket(provider).acquire(timeout=timeout):
+        return True
+    logger.error(f"Rate limit for {provider} reached, skipping search")
+    return False
+
+
+def acquire_download(provider: str):
+    get_bucket(f"{provider}_download").acquire()
+
+
+def _get_header_number(headers, *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def record_response(key: str, response: requests.Response):
+    method = response.request.method if response.request is not None else 'GET'
+    http_requests.inc(key, method, response.status_code)
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+        http_response_bytes.inc(key, method, amount=int(content_length))
+
+    bucket = get_bucket(key)
+    if response.status_code == 429:
+        retry_after = _get_header_number(response.headers, 'Retry-After')
+        wait = bucket.back_off(retry_after)
+        logger.warning(f"{key} answered 429, backing off for {wait:.0f}s")
+        return
+
+    remaining = _get_header_number(response.headers, 'X-Ratelimit-Remaining', 'X-RateLimit-Remaining')
+    reset = _get_header_number(response.headers, 'X-Ratelimit-Reset', 'X-RateLimit-Reset')
+    if reset is not None and reset > 1_000_000_000:
+        reset = max(0.0, reset - time.time())
+    if remaining is not None or reset is not None:
+        bucket.update_quota(int(remaining) if remaining is not None else None, reset)
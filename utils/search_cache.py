@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+
+from utils.common_utils import project_name
+from utils.log_utils import logger
+from utils.metrics import search_cache_lookups
+
+load_dotenv()
+
+search_cache_path = f"assets/{project_name}/search_cache.sqlite3"
+use_search_cache = os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+use_offline_mode = os.getenv('SEARCH_CACHE_OFFLINE', 'false').lower() == 'true'
+default_ttl_hours = float(os.getenv('SEARCH_CACHE_TTL_HOURS', '24'))
+
+SearchFetcher = Callable[[Optional[str]], tuple[Optional[Any], Optional[str], bool]]
+
+_connection: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def get_ttl_seconds(provider: str) -> float:
+    return float(os.getenv(f'{provider.upper()}_SEARCH_CACHE_TTL_HOURS', str(default_ttl_hours))) * 3600
+
+
+def normalize_term(term: str) -> str:
+    return ' '.join(term.lower().split())
+
+
+def _get_connection() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(search_cache_path), exist_ok=True)
+        _connection = sqlite3.connect(search_cache_path, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                provider TEXT NOT NULL,
+                term TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                per_page INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                etag TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (provider, term, page, per_page)
+            )
+        """)
+        _connection.commit()
+    return _connection
+
+
+def _read_entry(key: tuple) -> Optional[tuple[Any, Optional[str], float]]:
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT payload, etag, fetched_at FROM search_cache "
+            "WHERE provider = ? AND term = ? AND page = ? AND per_page = ?", key).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0]), row[1], row[2]
+
+
+def _write_entry(key: tuple, payload: Any, etag: Optional[str]):
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO search_cache (provider, term, page, per_page, payload, etag, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", (*key, json.dumps(payload), etag, time.time()))
+        connection.commit()
+
+
+def _touch_entry(key: tuple):
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "UPDATE search_cache SET fetched_at = ? "
+            "WHERE provider = ? AND term = ? AND page = ? AND per_page = ?", (time.time(), *key))
+        connection.commit()
+
+
+def cached_search(provider: str, term: str, page: int, per_page: int, fetch: SearchFetcher) -> Optional[Any]:
+    if not use_search_cache:
+        search_cache_lookups.inc(provider, 'disabled')
+        return fetch(None)[0]
+
+    key = (provider, normalize_term(term), page, per_page)
+    entry = _read_entry(key)
+
+    if entry is not None:
+        payload, etag, fetched_at = entry
+        if use_offline_mode or time.time() - fetched_at < get_ttl_seconds(provider):
+            search_cache_lookups.inc(provider, 'hit')
+            return payload
+    elif use_offline_mode:
+        search_cache_lookups.inc(provider, 'offline_miss')
+        logger.info(f"Offline mode: no cached {provider} results for '{term}'")
+        return None
+
+    payload, etag, not_modified = fetch(entry[1] if entry else None)
+    if not_modified and entry is not None:
+        search_cache_lookups.inc(provider, 'revalidated')
+        _touch_entry(key)
+        return entry[0]
+    if payload is None:
+        search_cache_lookups.inc(provider, 'stale' if entry is not None else 'error')
+        return entry[0] if entry is not None else None
+
+    search_cache_lookups.inc(provider, 'miss')
+    _write_entry(key, payload, etag)
+    return payload
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+from io import BytesIO
+from typing import Optional
+
+import requests
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+from utils.common_utils import project_name, create_folders_if_not_exist
+from utils.download_utils import get_session
+from utils.log_utils import logger
+
+load_dotenv()
+
+thumbnail_size = int(os.getenv('THUMBNAIL_SIZE', '320'))
+thumbnail_cache_max_mb = float(os.getenv('THUMBNAIL_CACHE_MAX_MB', '256'))
+thumbnail_folder = f"assets/{project_name}/thumb_files"
+max_source_bytes = 20 * 1000 * 1000
+
+_cache_bytes: Optional[int] = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_source_url(img: dict) -> Optional[str]:
+    if img.get('apiType') == 'pexels':
+        return img.get('medium') or img.get('small') or img.get('tiny')
+    elif img.get('apiType') == 'pixabay':
+        return img.get('webformatURL') or img.get('previewURL')
+    elif img.get('apiType') == 'unsplash':
+        urls = img.get('urls', {})
+        return urls.get('small') or urls.get('thumb')
+    elif img.get('apiType') == 'flickr':
+        return img.get('url')
+    return None
+
+
+def _safe_name(value: str) -> str:
+    return "".join(c for c in str(value) if c.isalnum() or c in '-_')
+
+
+def get_thumbnail_path(api_type: str, image_id: str) -> str:
+    return os.path.join(thumbnail_folder, _safe_name(api_type), f"{_safe_name(image_id)}.jpg")
+
+
+def _read_remote(url: str) -> Optional[bytes]:
+    try:
+        with get_session(url).get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            data = BytesIO()
+            for chunk in response.iter_content(64 * 1024):
+                data.write(chunk)
+                if data.tell() > max_source_bytes:
+                    logger.error(f"Thumbnail source {url} is larger than {max_source_bytes} bytes")
+                    return None
+            return data.getvalue()
+    except requests.RequestException as e:
+        logger.error(f"Error fetching thumbnail source {url}: {e}")
+        return None
+
+
+def _get_cache_bytes() -> int:
+    global _cache_bytes
+    if _cache_bytes is None:
+        _cache_bytes = sum(entry.stat().st_size
+                           for api_dir in os.scandir(thumbnail_folder) if api_dir.is_dir()
+                           for entry in os.scandir(api_dir.path) if entry.is_file())
+    return _cache_bytes
+
+
+def _evict_thumbnails(max_bytes: int):
+    global _cache_bytes
+    entries = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                     for api_dir in os.scandir(thumbnail_folder) if api_dir.is_dir()
+                     for entry in os.scandir(api_dir.path) if entry.is_file())
+    _cache_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if _cache_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            _cache_bytes -= size
+        except FileNotFoundError:
+            pass
+
+
+def _store_thumbnail(source, thumb_path: str):
+    global _cache_bytes
+    with _cache_lock:
+        _get_cache_bytes()
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        image.thumbnail((thumbnail_size, thumbnail_size))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(thumb_path), suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                image.save(file, 'JPEG', quality=80, optimize=True, progressive=True)
+            os.replace(tmp_path, thumb_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+    with _cache_lock:
+        _cache_bytes += os.path.getsize(thumb_path)
+        max_bytes = int(thumbnail_cache_max_mb * 1024 * 1024)
+        if _cache_bytes > max_bytes:
+            _evict_thumbnails(int(max_bytes * 0.9))
+
+
+def touch_thumbnail(thumb_path: str):
+    try:
+        os.utime(thumb_path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_thumbnail(api_type: str, image_id: str):
+    global _cache_bytes
+    thumb_path = get_thumbnail_path(api_type, image_id)
+    with _cache_lock:
+        try:
+            size = os.path.getsize(thumb_path)
+            os.remove(thumb_path)
+        except FileNotFoundError:
+            return
+        if _cache_bytes is not None:
+            _cache_bytes -= size
+
+
+def get_or_create_thumbnail(api_type: str, image_id: str, local_path: Optional[str] = None,
+                            remote_url: Optional[str] = None) -> Optional[str]:
+    thumb_path = get_thumbnail_path(api_type, image_id)
+    if os.path.exists(thumb_path):
+        touch_thumbnail(thumb_path)
+        return thumb_path
+
+    create_folders_if_not_exist([os.path.dirname(thumb_path)])
+    try:
+        if local_path and os.path.exists(local_path):
+            _store_thumbnail(local_path, thumb_path)
+        elif remote_url:
+            data = _read_remote(remote_url)
+            if data is None:
+                return None
+            _store_thumbnail(BytesIO(data), thumb_path)
+        else:
+            return None
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.error(f"Error creating thumbnail for {api_type} image {image_id}: {e}")
+        return None
+
+    return thumb_path
@@ -0,0 +1,107 @@
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+load_dotenv()
+
+transcode_enabled = os.getenv('TRANSCODE_OVERSIZED', 'false').lower() == 'true'
+transcode_max_dimension = int(os.getenv('TRANSCODE_MAX_DIMENSION', '0'))
+transcode_workers = int(os.getenv('TRANSCODE_WORKERS', '4'))
+transcode_max_source_mb = float(os.getenv('TRANSCODE_MAX_SOURCE_MB', '25'))
+min_quality = 40
+max_quality = 90
+min_dimension = 320
+downscale_step = 0.8
+image_formats = {'jpg': 'jpeg', 'jpeg': 'jpeg', 'webp': 'webp', 'png': 'png'}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_transcode_format(extension: str) -> Optional[str]:
+    return image_formats.get(extension.lower())
+
+
+def _encode(image: Image.Image, image_format: str, quality: int) -> bytes:
+    buffer = BytesIO()
+    if image_format == 'png':
+        image.save(buffer, 'PNG', optimize=True)
+    elif image_format == 'webp':
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _fit_quality(image: Image.Image, image_format: str, max_bytes: int) -> Optional[bytes]:
+    if image_format == 'png':
+        for candidate in (image, image.quantize(256)):
+            data = _encode(candidate, image_format, max_quality)
+            if len(data) <= max_bytes:
+                return data
+        return None
+
+    best = None
+    low, high = min_quality, max_quality
+    while low <= high:
+        quality = (low + high) // 2
+        data = _encode(image, image_format, quality)
+        if len(data) <= max_bytes:
+            best = data
+            low = quality + 1
+        else:
+            high = quality - 1
+    return best
+
+
+def fit_image(source_path: str, target_folder: str, max_bytes: int, image_format: str,
+              max_dimension: int = 0) -> Optional[tuple[str, int, str]]:
+    with Image.open(source_path) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if image_format == 'png' and image.has_transparency_data else 'RGB')
+    if max_dimension > 0:
+        image.thumbnail((max_dimension, max_dimension))
+
+    while True:
+        data = _fit_quality(image, image_format, max_bytes)
+        if data is not None:
+            break
+        if min(image.size) * downscale_step < min_dimension:
+            return None
+        image = image.resize((int(image.width * downscale_step), int(image.height * downscale_step)),
+                             Image.Resampling.LANCZOS)
+
+    fd, tmp_path = tempfile.mkstemp(dir=target_folder, suffix='.part')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(data)
+    return tmp_path, len(data), hashlib.sha256(data).hexdigest()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context('spawn')
+            _pool = ProcessPoolExecutor(max_workers=max(1, transcode_workers), mp_context=context)
+    return _pool
+
+
+def transcode_to_budget(source_path: str, max_bytes: int, extension: str) -> Optional[tuple[str, int, str]]:
+    image_format = get_transcode_format(extension)
+    if image_format is None:
+        raise ValueError(f"Cannot re-encode .{extension} images")
+    future = _get_pool().submit(fit_image, source_path, os.path.dirname(source_path), max_bytes,
+                                image_format, transcode_max_dimension)
+    return future.result()
@@ -1,12 +1,15 @@
 import os
-import time
 from dataclasses import dataclass, field
 from typing import Optional, List
 import requests
 from dotenv import load_dotenv
 
-from utils.common_utils import get_remote_size, read_json_file
+from utils.common_utils import read_json_file
+from utils.download_utils import DownloadTask, DownloadStats, download_images
+from utils.rate_limit_utils import acquire_search, record_response
+from utils.search_cache import cached_search
 from utils.log_utils import logger
+from utils.metrics import search_seconds
 
 load_dotenv()
 
@@ -15,7 +18,6 @@ unsplash_api_key = os.getenv('UNSPLASH_API_KEY')
 if not unsplash_api_key:
     raise EnvironmentError(
         "Environment variable `UNSPLASH_API_KEY` is not set. Set it in the environment or in a `.env` file.")
-max_image_kb = int(os.getenv('MAX_KB_IMAGE_SIZE', '512'))
 
 
 @dataclass
@@ -129,26 +131,44 @@ def get_unsplash_image_from_api_result(item: dict) -> UnsplashImage:
     )
 
 
-def get_image_from_unsplash(query, limit=15) -> list[UnsplashImage]:
+def fetch_unsplash_search(query, limit=15, page_idx=1, etag=None) -> tuple[Optional[dict], Optional[str], bool]:
     url = f"{unsplash_api_url}/search/photos"
     params = {
         "query": query,
+        "page": page_idx,
         "per_page": limit,
         "client_id": unsplash_api_key,
         "order_by": "relevant"
     }
+    headers = {'If-None-Match': etag} if etag else {}
+    if not acquire_search('unsplash'):
+        return None, None, False
 
     try:
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, headers=headers, timeout=30)
     except requests.RequestException as e:
         logger.error(f"Error fetching images from Unsplash for query '{query}': {e}")
-        return []
+        return None, None, False
+
+    record_response('unsplash', response)
+
+    if response.status_code == 304:
+        return None, etag, True
 
     if response.status_code != 200:
         logger.error(f"Error occurred: {response.status_code} - {response.text}")
+        return None, None, False
+
+    return response.json(), response.headers.get('ETag'), False
+
+
+@search_seconds.time('unsplash')
+def get_image_from_unsplash(query, limit=15, page_idx=1) -> list[UnsplashImage]:
+    data = cached_search('unsplash', query, page_idx, limit,
+                         lambda etag: fetch_unsplash_search(query, limit, page_idx, etag))
+    if not data:
         return []
 
-    data = response.json()
     images = []
 
     for item in data['results']:
@@ -206,36 +226,17 @@ def convert_unsplash_image_to_json(img: UnsplashImage) -> dict:
     }
 
 
-def download_unsplash_images(image_list: list[UnsplashImage], folder_name: str):
-    for img in image_list:
-        url = remove_id_from_img_url(img.urls.full)
-        image_info = get_remote_size(url)
-        content_kb = image_info.get('kb_decimal', 0)
+def get_unsplash_download_task(img: UnsplashImage, folder_name: str) -> DownloadTask:
+    urls = [remove_id_from_img_url(url) for url in (img.urls.full, img.urls.regular, img.urls.small) if url]
+    return DownloadTask(api_type='unsplash',
+                        image_id=img.id,
+                        urls=urls,
+                        folder=folder_name,
+                        extension=get_extension_from_url(urls[0]) if urls else 'jpg')
 
-        if content_kb > max_image_kb:
-            url = remove_id_from_img_url(img.urls.regular)
-            image_info = get_remote_size(url)
-            content_kb = image_info.get('kb_decimal', 0)
 
-        if content_kb > max_image_kb:
-            url = remove_id_from_img_url(img.urls.small)
-            image_info = get_remote_size(url)
-            content_kb = image_info.get('kb_decimal', 0)
-
-        if content_kb <= max_image_kb:
-            try:
-                image_data = requests.get(url, timeout=30)
-            except requests.RequestException as e:
-                print(f"Error downloading image {img.id} from Unsplash: {e}")
-                return
-
-            extension = get_extension_from_url(url)
-            image_path = os.path.join(folder_name, f"{img.id}.{extension}")
-            with open(image_path, 'wb') as file:
-                file.write(image_data.content)
-            print(f"Downloaded image {img.id} to {image_path} ({content_kb:.2f} KB)")
-        else:
-            print(f"Skipped image {img.id} ({content_kb:.2f} KB exceeds limit)")
+def download_unsplash_images(image_list: list[UnsplashImage], folder_name: str) -> DownloadStats:
+    return download_images([get_unsplash_download_task(img, folder_name) for img in image_list])
 
 
 def convert_json_to_unsplash_image(img_data: dict) -> UnsplashImage:
@@ -274,13 +275,14 @@ def convert_json_to_unsplash_image(img_data: dict) -> UnsplashImage:
     )
 
 
-def download_unsplash_images_from_json(json_file: str, folder_name: str):
-    json_data = read_json_file(json_file)
-    for term, images in json_data.items():
-        image_list = [convert_json_to_unsplash_image(img_data) for img_data in images if
-                      img_data.get('apiType') == 'unsplash']
-        download_unsplash_images(image_list, folder_name)
-        time.sleep(10)
+def get_unsplash_download_tasks(json_data: dict, folder_name: str) -> list[DownloadTask]:
+    return [get_unsplash_download_task(convert_json_to_unsplash_image(img_data), os.path.join(folder_name, term))
+            for term, images in json_data.items()
+            for img_data in images if img_data.get('apiType') == 'unsplash']
+
+
+def download_unsplash_images_from_json(json_file: str, folder_name: str) -> DownloadStats:
+    return download_images(get_unsplash_download_tasks(read_json_file(json_file), folder_name))
 
 
 def renew_unsplash_image(img: UnsplashImage) -> UnsplashImage:
@@ -289,12 +291,17 @@ def renew_unsplash_image(img: UnsplashImage) -> UnsplashImage:
         "client_id": unsplash_api_key
     }
 
+    if not acquire_search('unsplash'):
+        return img
+
     try:
         response = requests.get(url, params=params)
     except requests.RequestException as e:
         logger.error(f"Error fetching image from Unsplash for id '{img.id}': {e}")
         return img
 
+    record_response('unsplash', response)
+
     if response.status_code != 200:
         logger.error(f"Error occurred: {response.status_code} - {response.text}")
         return img